@@ -0,0 +1,140 @@
+import os
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from psycopg import AsyncCursor
+from psycopg.conninfo import make_conninfo
+from psycopg_pool import AsyncConnectionPool, PoolTimeout, TooManyRequests
+from db_config import (
+    DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_POOL_TIMEOUT, DB_POOL_HEALTHCHECK_INTERVAL,
+    PoolExhaustedError, get_connection_kwargs
+)
+from metrics import observe_checkout, observe_statement, register_pool
+
+# Requests allowed to queue for a connection before new ones are rejected (0 = unbounded)
+DB_POOL_MAX_WAITING = int(os.getenv('DB_POOL_MAX_WAITING', 0))
+
+_last_used = {}
+
+# Statements run on behalf of the current request (see start_statement_count)
+_statement_counter = ContextVar('statement_counter', default=None)
+
+
+class StatementCounter:
+    """Number of SQL statements a request has sent so far"""
+
+    def __init__(self, scope=None):
+        self.count = 0
+        # The ASGI scope of the request, used to label statement metrics by route
+        self.scope = scope
+
+
+def start_statement_count(scope=None):
+    """Start counting the statements run in the current context"""
+    counter = StatementCounter(scope)
+    _statement_counter.set(counter)
+    return counter
+
+
+def _record_statement(query, started, rows):
+    counter = _statement_counter.get()
+    scope = None
+    if counter is not None:
+        counter.count += 1
+        scope = counter.scope
+    observe_statement(scope, query, time.perf_counter() - started, rows)
+
+
+class CountingCursor(AsyncCursor):
+    """AsyncCursor that counts and times every statement it sends"""
+
+    async def execute(self, query, params=None, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await super().execute(query, params, **kwargs)
+        finally:
+            _record_statement(query, started, self.rowcount)
+
+    async def executemany(self, query, params_seq, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await super().executemany(query, params_seq, **kwargs)
+        finally:
+            _record_statement(query, started, self.rowcount)
+
+    @asynccontextmanager
+    async def copy(self, statement, params=None, **kwargs):
+        started = time.perf_counter()
+        try:
+            async with super().copy(statement, params, **kwargs) as copy:
+                yield copy
+        finally:
+            _record_statement(statement, started, self.rowcount)
+
+
+def get_conninfo():
+    """Build a libpq connection string from the settings in db_config.py"""
+    kwargs = get_connection_kwargs()
+    if 'dsn' in kwargs:
+        return kwargs['dsn']
+    kwargs['dbname'] = kwargs.pop('database')
+    return make_conninfo('', **kwargs)
+
+
+async def _check_connection(connection):
+    """Ping connections that sat idle long enough to have been dropped upstream"""
+    if time.monotonic() - _last_used.get(id(connection), 0) < DB_POOL_HEALTHCHECK_INTERVAL:
+        return
+    await AsyncConnectionPool.check_connection(connection)
+
+
+async def _reset_connection(connection):
+    """Remember when a connection went back to the pool"""
+    _last_used[id(connection)] = time.monotonic()
+
+
+_pool = AsyncConnectionPool(
+    get_conninfo(),
+    min_size=DB_POOL_MIN_SIZE,
+    max_size=DB_POOL_MAX_SIZE,
+    timeout=DB_POOL_TIMEOUT,
+    max_waiting=DB_POOL_MAX_WAITING,
+    check=_check_connection,
+    reset=_reset_connection,
+    kwargs={'cursor_factory': CountingCursor},
+    open=False,
+)
+register_pool(_pool)
+
+
+def get_async_pool():
+    """Return the process-wide async connection pool"""
+    return _pool
+
+
+async def open_async_pool():
+    """Start filling the pool (called on application startup)"""
+    await _pool.open(wait=False)
+
+
+async def close_async_pool():
+    """Close every pooled connection (called on application shutdown)"""
+    await _pool.close()
+    _last_used.clear()
+
+
+@asynccontextmanager
+async def get_async_connection():
+    """Check out an async connection for the duration of the block.
+
+    The transaction is committed when the block exits normally and rolled
+    back on error. Raises PoolExhaustedError when no connection frees up
+    within DB_POOL_TIMEOUT or the wait queue is full.
+    """
+    started = time.perf_counter()
+    try:
+        async with _pool.connection() as connection:
+            observe_checkout(time.perf_counter() - started)
+            yield connection
+    except (PoolTimeout, TooManyRequests) as e:
+        raise PoolExhaustedError(f"No database connection available: {e}") from e
@@ -0,0 +1,53 @@
+import os
+import numpy as np
+
+# Longest from/to window accepted by GET /availability/calendar
+MAX_CALENDAR_DAYS = int(os.getenv('MAX_CALENDAR_DAYS', 366))
+
+# Day codes of the calendar grid, one character per room-night
+FREE, BOOKED, CHECKED_IN = "0", "1", "2"
+
+# Active bookings overlapping the window, as grid columns [start, end) and a day
+# code; the stay && range test is answered by the GiST index on bookings.stay
+CALENDAR_STAYS_QUERY = """
+    SELECT b.room_id,
+           GREATEST(b.check_in_date - %(date_from)s, 0) AS start_day,
+           LEAST(b.check_out_date - %(date_from)s, %(days)s) AS end_day,
+           CASE b.status WHEN 'checked-in' THEN 2 ELSE 1 END AS code
+    FROM bookings b
+    WHERE b.status IN ('confirmed', 'checked-in')
+    AND b.stay && daterange(%(date_from)s, %(date_to)s, '[]')
+"""
+
+
+def paint_calendar(room_ids, stays, days):
+    """Room x day matrix of day codes for stays of (room_id, start_day, end_day, code).
+
+    Each stay adds its code at its start column and subtracts it at its end
+    column, so a cumulative sum along each row paints every night in between.
+    Active stays of a room never overlap (bookings_no_overlap), so the sums
+    are always 0 or one stay's code.
+    """
+    room_ids = np.asarray(room_ids, dtype=np.int64)
+    width = days + 1
+    if not len(room_ids):
+        return np.zeros((0, days), dtype=np.uint8)
+    stays = np.asarray(stays, dtype=np.int64).reshape(-1, 4)
+    order = np.argsort(room_ids)
+    rows = order[np.searchsorted(room_ids[order], stays[:, 0]).clip(max=len(room_ids) - 1)]
+    # Bookings of rooms outside the grid (another room_type) are dropped
+    keep = room_ids[rows] == stays[:, 0]
+    rows, starts, ends, codes = rows[keep], stays[keep, 1], stays[keep, 2], stays[keep, 3]
+    size = len(room_ids) * width
+    edges = (np.bincount(rows * width + starts, weights=codes, minlength=size)
+             - np.bincount(rows * width + ends, weights=codes, minlength=size))
+    return np.cumsum(edges.reshape(len(room_ids), width), axis=1)[:, :days].astype(np.uint8)
+
+
+def encode_grid(grid):
+    """One string of day codes per room, e.g. "0011120" """
+    if not grid.size:
+        return [""] * grid.shape[0]
+    text = (grid + ord(FREE)).tobytes().decode("ascii")
+    days = grid.shape[1]
+    return [text[i:i + days] for i in range(0, len(text), days)]
@@ -0,0 +1,118 @@
+import csv
+import io
+import json
+import os
+from fastapi import HTTPException
+from pydantic import ValidationError
+from models import Room, Guest, Booking
+
+# Largest upload accepted by the bulk import endpoints, in data rows
+BULK_IMPORT_MAX_ROWS = int(os.getenv('BULK_IMPORT_MAX_ROWS', 200000))
+
+INT_MIN, INT_MAX = -2 ** 31, 2 ** 31 - 1
+
+# Column limits from database/init.sql, checked per row so that one bad value
+# is reported for its line instead of aborting the whole COPY or INSERT
+MAX_LENGTHS = {
+    Room: {"room_number": 10, "room_type": 50},
+    Guest: {"first_name": 50, "last_name": 50, "email": 100, "phone": 20},
+    Booking: {},
+}
+STATUSES = {
+    Room: ("available", "occupied", "maintenance"),
+    Booking: ("confirmed", "checked-in", "checked-out", "cancelled"),
+}
+
+
+def iter_records(body, import_format):
+    """Yield (line, dict) for each record of a CSV (with header) or NDJSON upload"""
+    text = body.decode("utf-8-sig")
+    if import_format == "csv":
+        reader = csv.DictReader(io.StringIO(text))
+        for record in reader:
+            # Empty cells count as missing so model defaults apply
+            yield reader.line_num, {k: v for k, v in record.items() if k is not None and v != ""}
+    else:
+        for line, raw in enumerate(text.splitlines(), start=1):
+            if not raw.strip():
+                continue
+            try:
+                record = json.loads(raw)
+            except ValueError as e:
+                yield line, f"Invalid JSON: {e}"
+                continue
+            yield line, record if isinstance(record, dict) else "Expected a JSON object"
+
+
+def check_record(model, record):
+    """Validate one record; return the model instance or an error message"""
+    if isinstance(record, str):
+        return record
+    try:
+        item = model.model_validate(record)
+    except ValidationError as e:
+        return "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+
+    for field, value in item:
+        if isinstance(value, int) and not INT_MIN <= value <= INT_MAX:
+            return f"{field}: out of range"
+    for field, limit in MAX_LENGTHS[model].items():
+        if len(getattr(item, field)) > limit:
+            return f"{field}: longer than {limit} characters"
+    if model in STATUSES and item.status not in STATUSES[model]:
+        return f"status: must be one of {', '.join(STATUSES[model])}"
+    return item
+
+
+async def parse_upload(request, import_format, model):
+    """Read an upload and split it into valid rows and per-line errors.
+
+    Returns (rows, errors) where rows is a list of (line, model instance)
+    and errors a list of {"line", "error"} dicts.
+    """
+    body = await request.body()
+    rows, errors = [], []
+    try:
+        for line, record in iter_records(body, import_format):
+            if len(rows) + len(errors) >= BULK_IMPORT_MAX_ROWS:
+                raise HTTPException(status_code=413,
+                                    detail=f"Uploads are limited to {BULK_IMPORT_MAX_ROWS} rows")
+            item = check_record(model, record)
+            if isinstance(item, str):
+                errors.append({"line": line, "error": item})
+            else:
+                rows.append((line, item))
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(status_code=400, detail=f"Could not parse upload: {e}")
+    return rows, errors
+
+
+async def copy_rows(cursor, table, columns, rows):
+    """COPY (line, *columns) of each parsed row into a staging table"""
+    async with cursor.copy(f"COPY {table} (line, {', '.join(columns)}) FROM STDIN") as copy:
+        for line, item in rows:
+            await copy.write_row((line, *(getattr(item, column) for column in columns)))
+
+
+async def stage_rows(cursor, staging_sql, table, columns, rows, statements):
+    """COPY parsed rows into a staging table and run the check/merge statements.
+
+    The statements flag bad rows by setting the staging table's error
+    column. Returns those rows as {"line", "error"} dicts.
+    """
+    await cursor.execute(staging_sql)
+    await copy_rows(cursor, table, columns, rows)
+    await cursor.execute(f"ANALYZE {table}")
+    for statement in statements:
+        await cursor.execute(statement)
+    await cursor.execute(f"SELECT line, error FROM {table} WHERE error IS NOT NULL")
+    return await cursor.fetchall()
+
+
+def import_result(rows, parse_errors, db_errors):
+    """Build the BulkImportResult body for an import"""
+    return {
+        "received": len(rows) + len(parse_errors),
+        "inserted": len(rows) - len(db_errors),
+        "errors": sorted(parse_errors + db_errors, key=lambda error: error["line"]),
+    }
@@ -0,0 +1,79 @@
+import os
+import time
+from collections import OrderedDict
+
+# Returned by TTLCache.get when there is no usable entry (None is a valid value)
+MISSING = object()
+
+
+class TTLCache:
+    """Small in-process cache with a per-entry TTL and LRU eviction.
+
+    Writers call clear() after committing. Readers pass the generation they
+    saw before querying to set(), so a result read before an invalidation is
+    never stored after it.
+    """
+
+    def __init__(self, maxsize, ttl, enabled=True):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.enabled = enabled
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        """Return the cached value for key, or MISSING"""
+        if not self.enabled:
+            return MISSING
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return MISSING
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key, value, generation):
+        """Store value unless the cache was invalidated since generation was read"""
+        if not self.enabled or generation != self.generation:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every entry and bump the generation"""
+        self._entries.clear()
+        self.generation += 1
+        self.invalidations += 1
+
+    def stats(self):
+        """Counters for the /stats/cache endpoint"""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+# Room catalog: /rooms, /rooms/{id} and /available-rooms without dates
+room_cache = TTLCache(
+    maxsize=int(os.getenv('ROOM_CACHE_MAXSIZE', 1024)),
+    ttl=float(os.getenv('ROOM_CACHE_TTL', 30)),
+    enabled=os.getenv('ROOM_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes'),
+)
@@ -0,0 +1,119 @@
+import os
+import zlib
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+
+# Bodies smaller than this are sent uncompressed
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+GZIP_LEVEL = int(os.getenv('GZIP_LEVEL', 6))
+# Brotli quality 4 compresses better than gzip -6 at about the same CPU cost
+BROTLI_QUALITY = int(os.getenv('BROTLI_QUALITY', 4))
+
+
+class GzipEncoder:
+    name = "gzip"
+
+    def __init__(self):
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data, final):
+        # Sync-flush streamed chunks so each one reaches the client right away
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class BrotliEncoder:
+    name = "br"
+
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data, final):
+        out = self._compressor.process(data)
+        return out + (self._compressor.finish() if final else self._compressor.flush())
+
+
+ENCODERS = {"br": BrotliEncoder, "gzip": GzipEncoder}
+
+
+def choose_encoder(accept_encoding):
+    """Pick br or gzip from an Accept-Encoding header (br wins a tie), or None"""
+    best, best_q = None, 0.0
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if name in ENCODERS and (q > best_q or (q == best_q and name == "br")):
+            best, best_q = name, q
+    return ENCODERS[best] if best else None
+
+
+class CompressionMiddleware:
+    """Compress responses with Brotli or gzip, whichever the client prefers.
+
+    Works like Starlette's GZipMiddleware, including for streamed responses,
+    but negotiates the encoding. Responses that already carry a
+    Content-Encoding, and bodies below COMPRESSION_MIN_SIZE, pass through.
+    """
+
+    def __init__(self, app, minimum_size=COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        encoder = None
+        if scope["type"] == "http":
+            encoder = choose_encoder(Headers(scope=scope).get("accept-encoding", ""))
+        if encoder is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        compressor = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                # Held back until the first body chunk shows whether to compress
+                start = message
+                passthrough = "content-encoding" in Headers(raw=message["headers"])
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            if passthrough:
+                if start is not None:
+                    await send(start)
+                    start = None
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                if len(body) < self.minimum_size and not more_body:
+                    passthrough = True
+                    await send(start)
+                    start = None
+                    await send(message)
+                    return
+                compressor = encoder()
+                headers = MutableHeaders(raw=start["headers"])
+                headers["Content-Encoding"] = compressor.name
+                headers.add_vary_header("Accept-Encoding")
+                body = compressor.compress(body, final=not more_body)
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    headers["Content-Length"] = str(len(body))
+                await send(start)
+                start = None
+            else:
+                body = compressor.compress(body, final=not more_body)
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
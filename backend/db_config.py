@@ -0,0 +1,38 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Connection pool settings (override via environment variables)
+DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', 2))
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', 20))
+# Seconds a request waits for a free connection before giving up with a 503
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 5))
+# Connections idle for longer than this are pinged with SELECT 1 on checkout
+DB_POOL_HEALTHCHECK_INTERVAL = float(os.getenv('DB_POOL_HEALTHCHECK_INTERVAL', 30))
+
+
+class PoolExhaustedError(Exception):
+    """Raised when no pooled connection becomes free within DB_POOL_TIMEOUT"""
+
+
+def get_connection_kwargs():
+    """Build connection arguments from the environment"""
+    # Use DATABASE_URL if available (for cloud deployment), otherwise construct from parts
+    database_url = os.getenv('DATABASE_URL')
+
+    if database_url:
+        # Add SSL mode for Supabase/cloud databases if not already in URL
+        if 'sslmode=' not in database_url:
+            database_url += '?sslmode=require'
+        return {'dsn': database_url}
+
+    # Fallback to individual connection parameters
+    return {
+        'host': os.getenv('DB_HOST', 'localhost'),
+        'port': int(os.getenv('DB_PORT', 5432)),
+        'user': os.getenv('DB_USER', 'postgres'),
+        'password': os.getenv('DB_PASSWORD', 'postgres'),
+        'database': os.getenv('DB_NAME', 'hotel_management'),
+        'sslmode': 'require'
+    }
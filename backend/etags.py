@@ -0,0 +1,51 @@
+import hashlib
+from fastapi import HTTPException
+
+# Change counters maintained by the bump_table_version() triggers in init.sql,
+# summed over each table's shards
+VERSIONS_QUERY = """
+    SELECT table_name, SUM(version)::bigint AS version FROM table_versions
+    WHERE table_name = ANY(%s)
+    GROUP BY table_name
+    ORDER BY table_name
+"""
+
+
+async def fetch_versions(cursor, *tables):
+    """Read the change counters of the tables a response is built from.
+
+    Read them before the data: if a write lands in between, the body is
+    newer than its ETag and the next request just gets a 200 again.
+    """
+    await cursor.execute(VERSIONS_QUERY, (list(tables),))
+    return tuple((row["table_name"], row["version"]) for row in await cursor.fetchall())
+
+
+def make_etag(request, versions):
+    """Weak ETag for this URL (path and query string) at these table versions"""
+    key = f"{request.url.path}?{request.url.query}|{versions}"
+    return 'W/"' + hashlib.sha1(key.encode()).hexdigest()[:24] + '"'
+
+
+def etag_matches(if_none_match, etag):
+    """Weak comparison of an If-None-Match header against etag"""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag.removeprefix("W/") in [c.removeprefix("W/") for c in candidates]
+
+
+def check_not_modified(request, response, etag):
+    """Tag the response and answer 304 if the client already has this version"""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=304, headers=headers)
+    if response is not None:
+        response.headers.update(headers)
+    return headers
+
+
+async def check_etag(request, response, cursor, *tables):
+    """fetch_versions + check_not_modified for handlers that aren't cached"""
+    versions = await fetch_versions(cursor, *tables)
+    return check_not_modified(request, response, make_etag(request, versions))
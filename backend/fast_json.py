@@ -0,0 +1,75 @@
+from decimal import Decimal
+import orjson
+import pyarrow as pa
+from fastapi import Response
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+def _default(value):
+    """orjson fallback for the NUMERIC columns (pydantic would render them as floats too)"""
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content):
+    """Encode rows straight from the database as JSON bytes"""
+    return orjson.dumps(content, default=_default)
+
+
+def json_response(content=None, headers=None, body=None):
+    """Return content (or an already encoded body) without re-validating it.
+
+    FastAPI passes a returned Response through untouched, so the route's
+    response_model still documents the schema but no longer validates and
+    re-encodes every row. Only use this for rows whose columns match the
+    response model exactly (see model_columns).
+    """
+    return Response(content=dumps(content) if body is None else body,
+                    media_type="application/json", headers=headers)
+
+
+def model_columns(model, alias=None):
+    """SELECT list with exactly the fields of a response model"""
+    prefix = f"{alias}." if alias else ""
+    return ", ".join(prefix + field for field in model.model_fields)
+
+
+def to_columns(rows, columns):
+    """Pivot rows into one list per column, so each key is sent once per page"""
+    return {column: [row[column] for row in rows] for column in columns}
+
+
+def encode_arrow(rows, columns):
+    """Encode rows as an Arrow IPC stream, with NUMERIC columns as float64 like the JSON"""
+    arrays = []
+    for values in to_columns(rows, columns).values():
+        array = pa.array(values)
+        if pa.types.is_decimal(array.type):
+            array = array.cast(pa.float64())
+        arrays.append(array)
+    table = pa.Table.from_arrays(arrays, names=list(columns))
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def page_response(page, headers, page_format, model):
+    """Return a build_page() page as row JSON, columnar JSON or an Arrow stream.
+
+    columnar is {"items": {column: [...]}, "next_cursor": ...}. Arrow carries
+    the rows only, so the next cursor goes in the X-Next-Cursor header.
+    """
+    columns = list(model.model_fields)
+    if page_format == "columnar":
+        return json_response({"items": to_columns(page["items"], columns),
+                              "next_cursor": page["next_cursor"]}, headers)
+    if page_format == "arrow":
+        headers = dict(headers or {})
+        if page["next_cursor"]:
+            headers["X-Next-Cursor"] = page["next_cursor"]
+        return Response(content=encode_arrow(page["items"], columns),
+                        media_type=ARROW_MEDIA_TYPE, headers=headers)
+    return json_response(page, headers)
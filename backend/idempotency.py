@@ -0,0 +1,209 @@
+import asyncio
+import hashlib
+import os
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse, Response
+from async_database import get_async_connection
+from db_config import PoolExhaustedError
+
+# Seconds a stored response is replayed for; older keys can be reused
+IDEMPOTENCY_TTL = int(os.getenv('IDEMPOTENCY_TTL', 86400))
+# Seconds between purges of expired keys (0 = keys are only reclaimed on reuse)
+IDEMPOTENCY_PURGE_INTERVAL = float(os.getenv('IDEMPOTENCY_PURGE_INTERVAL', 3600))
+MAX_KEY_LENGTH = 255
+
+# Writes that honour an Idempotency-Key header: POST and PUT under these paths
+IDEMPOTENT_METHODS = ("POST", "PUT")
+IDEMPOTENT_RESOURCES = ("bookings", "guests", "rooms")
+
+# Claim the key, or return what is stored under it. A key whose TTL has run
+# out is claimed again. When another request is inserting the same key right
+# now, the INSERT waits for it and neither branch returns a row.
+CLAIM_QUERY = """
+    WITH claimed AS (
+        INSERT INTO idempotency_keys (key, fingerprint) VALUES (%(key)s, %(fingerprint)s)
+        ON CONFLICT (key) DO UPDATE
+        SET fingerprint = EXCLUDED.fingerprint, status_code = NULL, body = NULL, created_at = now()
+        WHERE idempotency_keys.created_at < now() - make_interval(secs => %(ttl)s)
+        RETURNING key
+    )
+    SELECT true AS claimed, NULL::bytea AS fingerprint, NULL::smallint AS status_code, NULL::bytea AS body
+    FROM claimed
+    UNION ALL
+    SELECT false, fingerprint, status_code, body FROM idempotency_keys
+    WHERE key = %(key)s AND NOT EXISTS (SELECT 1 FROM claimed)
+"""
+
+
+def is_idempotent_write(scope):
+    """Whether a request may carry an Idempotency-Key"""
+    return (scope["type"] == "http" and scope["method"] in IDEMPOTENT_METHODS
+            and scope["path"].strip("/").split("/")[0] in IDEMPOTENT_RESOURCES)
+
+
+async def read_body(scope, receive):
+    """The whole request body and the fingerprint of method, path, query and body.
+
+    Returns None if the client disconnects before the body is complete.
+    """
+    digest = hashlib.sha256(b"%s %s?%s\n" % (scope["method"].encode(), scope["raw_path"], scope["query_string"]))
+    chunks = []
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return None
+        chunks.append(message.get("body", b""))
+        digest.update(chunks[-1])
+        more_body = message.get("more_body", False)
+    return b"".join(chunks), digest.digest()
+
+
+async def claim_key(key, fingerprint):
+    """(claimed, stored row or None); None with claimed False means the key is in flight"""
+    async with get_async_connection() as connection:
+        cursor = await connection.execute(CLAIM_QUERY, {"key": key, "fingerprint": fingerprint,
+                                                        "ttl": IDEMPOTENCY_TTL})
+        row = await cursor.fetchone()
+    if row is None:
+        return False, None
+    return row[0], row[1:]
+
+
+async def store_response(key, status_code, body):
+    async with get_async_connection() as connection:
+        await connection.execute("UPDATE idempotency_keys SET status_code = %s, body = %s WHERE key = %s",
+                                 (status_code, body, key))
+
+
+async def release_key(key):
+    """Forget a claim whose request failed, so a retry runs it again"""
+    try:
+        async with get_async_connection() as connection:
+            await connection.execute("DELETE FROM idempotency_keys WHERE key = %s", (key,))
+    except Exception as e:
+        print(f"Error releasing idempotency key {key!r}: {type(e).__name__}: {e}")
+
+
+class IdempotencyMiddleware:
+    """Make POST and PUT on /bookings, /guests and /rooms safe to retry.
+
+    A request with an Idempotency-Key header runs once. Its status and body
+    are stored under the key together with a fingerprint of the request,
+    and a retry with the same key gets them back without touching the
+    handler. Reusing a key for a different request is a 422, and a retry
+    while the first attempt is still running a 409 with Retry-After. Server
+    errors aren't stored, so the request can be retried.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        key = Headers(scope=scope).get("idempotency-key") if is_idempotent_write(scope) else None
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > MAX_KEY_LENGTH:
+            response = JSONResponse(status_code=400,
+                                    content={"detail": f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters"})
+            await response(scope, receive, send)
+            return
+
+        received = await read_body(scope, receive)
+        if received is None:
+            # The client is gone. Answer without claiming the key or running the
+            # handler, so a retry with the full body is handled as a first attempt.
+            await JSONResponse(status_code=400, content={"detail": "Request body was not received in full"})(
+                scope, receive, send)
+            return
+        body, fingerprint = received
+        try:
+            claimed, previous = await claim_key(key, fingerprint)
+        except PoolExhaustedError as e:
+            await JSONResponse(status_code=503, content={"detail": str(e)}, headers={"Retry-After": "1"})(
+                scope, receive, send)
+            return
+
+        if not claimed:
+            if previous is None or previous[1] is None:
+                response = JSONResponse(status_code=409, headers={"Retry-After": "1"},
+                                        content={"detail": "A request with this Idempotency-Key is still in progress"})
+            elif previous[0] != fingerprint:
+                response = JSONResponse(status_code=422,
+                                        content={"detail": "Idempotency-Key was already used for a different request"})
+            else:
+                response = Response(content=previous[2], status_code=previous[1], media_type="application/json",
+                                    headers={"Idempotent-Replayed": "true"})
+            await response(scope, receive, send)
+            return
+
+        replayed = False
+
+        async def receive_body():
+            nonlocal replayed
+            if replayed:
+                return await receive()
+            replayed = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        status_code = None
+        chunks = []
+        completed = False
+
+        async def send_recorded(message):
+            nonlocal status_code, completed
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body" and status_code < 500:
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    completed = True
+                    # Stored before the client sees the response, so its retry finds it. If
+                    # that fails the key stays claimed: the write went through, so a retry
+                    # must not run it again.
+                    try:
+                        await store_response(key, status_code, b"".join(chunks))
+                    except Exception as e:
+                        print(f"Error storing response for idempotency key {key!r}: {type(e).__name__}: {e}")
+            await send(message)
+
+        try:
+            await self.app(scope, receive_body, send_recorded)
+        finally:
+            if not completed:
+                await release_key(key)
+
+
+async def purge_expired_keys():
+    """Delete keys older than IDEMPOTENCY_TTL"""
+    try:
+        async with get_async_connection() as connection:
+            await connection.execute("DELETE FROM idempotency_keys WHERE created_at < now() - make_interval(secs => %s)",
+                                     (IDEMPOTENCY_TTL,))
+    except Exception as e:
+        print(f"Error purging idempotency keys: {type(e).__name__}: {e}")
+
+
+async def run_purge_worker(interval):
+    while True:
+        await purge_expired_keys()
+        await asyncio.sleep(interval)
+
+
+def start_purge_worker():
+    """Start the periodic purge of expired keys (called on application startup)"""
+    if IDEMPOTENCY_PURGE_INTERVAL <= 0:
+        return None
+    return asyncio.create_task(run_purge_worker(IDEMPOTENCY_PURGE_INTERVAL))
+
+
+async def stop_purge_worker(worker):
+    """Cancel the periodic purge (called on application shutdown)"""
+    if worker is None:
+        return
+    worker.cancel()
+    try:
+        await worker
+    except asyncio.CancelledError:
+        pass
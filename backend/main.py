@@ -1,15 +1,71 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager, AsyncExitStack
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import List, Optional
+from datetime import date
+import csv
+import io
+import json
+import os
+import time
 import uvicorn
-from psycopg2.extras import RealDictCursor
-from database import get_db_connection, close_db_connection
+from psycopg import errors
+from psycopg.rows import dict_row, tuple_row
+from db_config import PoolExhaustedError
+from async_database import get_async_connection, open_async_pool, close_async_pool, start_statement_count
 from models import (
-    Room, RoomResponse, Guest, GuestResponse, 
-    Booking, BookingResponse, BookingDetail
+    Room, RoomResponse, Guest, GuestResponse,
+    Booking, BookingResponse, BookingBatch, BookingBatchResult, BookingDetail, GuestPage, BookingPage, DashboardStats,
+    OccupancyDay, OccupancySummary, BulkImportResult, AvailabilityCalendar
 )
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, build_page
+from rollups import refresh_daily_stats
+from room_status import start_sync_worker, stop_sync_worker, sync_rooms, sync_stats
+from cache import MISSING, room_cache
+from etags import check_etag, check_not_modified, fetch_versions, make_etag
+from bulk_import import STATUSES, parse_upload, stage_rows, import_result
+from metrics import observe_request, render_metrics
+from availability import MAX_CALENDAR_DAYS, CALENDAR_STAYS_QUERY, paint_calendar, encode_grid
+from compression import CompressionMiddleware
+from idempotency import IdempotencyMiddleware, start_purge_worker, stop_purge_worker
+from fast_json import dumps, json_response, model_columns, page_response
 
-app = FastAPI(title="Hotel Management System API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await open_async_pool()
+    sync_worker = start_sync_worker()
+    purge_worker = start_purge_worker()
+    yield
+    await stop_purge_worker(purge_worker)
+    await stop_sync_worker(sync_worker)
+    await close_async_pool()
+
+# Rows fetched per server-side cursor round trip when streaming exports
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 2000))
+
+# Most rooms accepted in one /bookings/batch request
+MAX_BATCH_BOOKINGS = int(os.getenv('MAX_BATCH_BOOKINGS', 100))
+
+# Columns of the rows the list endpoints encode without re-validation (see fast_json.py)
+ROOM_COLUMNS = model_columns(RoomResponse)
+ROOM_COLUMNS_R = model_columns(RoomResponse, "r")
+GUEST_COLUMNS = model_columns(GuestResponse)
+
+# Longest from/to window accepted by the occupancy stats endpoints
+MAX_STATS_DAYS = int(os.getenv('MAX_STATS_DAYS', 3660))
+
+# Matches returned by the typeahead search endpoints
+DEFAULT_SEARCH_LIMIT = 10
+MAX_SEARCH_LIMIT = 50
+# Substring matches a guest search ranks at most; any further matches are never sorted
+GUEST_SEARCH_CANDIDATES = int(os.getenv('GUEST_SEARCH_CANDIDATES', 200))
+
+app = FastAPI(title="Hotel Management System API", lifespan=lifespan)
+
+# Replays writes retried with the same Idempotency-Key. Added first so it sits
+# inside CORS and compression and stores the plain response body.
+app.add_middleware(IdempotencyMiddleware)
 
 # CORS middleware
 app.add_middleware(
@@ -20,553 +76,1245 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Brotli or gzip, as negotiated with Accept-Encoding
+app.add_middleware(CompressionMiddleware)
+
+def to_json(value):
+    """json.dumps fallback for the date and datetime columns"""
+    return value.isoformat()
+
+def like_prefix(text):
+    """ILIKE pattern matching values that start with text, taken literally"""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+def check_date_order(date_from, date_to):
+    """Reject a from/to window that ends before it starts"""
+    if date_from and date_to and date_to < date_from:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+
+def check_booking_status(status):
+    """Reject a status the bookings table's CHECK constraint would refuse"""
+    if status not in STATUSES[Booking]:
+        raise HTTPException(status_code=400, detail=f"Status must be one of {', '.join(STATUSES[Booking])}")
+
+def encode_csv(rows):
+    """Render rows as a chunk of CSV text"""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+@app.middleware("http")
+async def instrument_requests(request: Request, call_next):
+    """Time each request per route and report its SQL statements in X-DB-Statements"""
+    started = time.perf_counter()
+    counter = start_statement_count(request.scope)
+    try:
+        response = await call_next(request)
+    except Exception:
+        observe_request(request.scope, 500, time.perf_counter() - started)
+        raise
+    observe_request(request.scope, response.status_code, time.perf_counter() - started)
+    response.headers["X-DB-Statements"] = str(counter.count)
+    return response
+
+@app.exception_handler(PoolExhaustedError)
+async def pool_exhausted_handler(request: Request, exc: PoolExhaustedError):
+    """Shed load with a retryable 503 when every pooled connection is busy"""
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
 @app.get("/")
-def read_root():
+async def read_root():
     return {"message": "Hotel Management System API"}
 
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Request, statement and connection pool metrics in the Prometheus text format"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
 # ==================== ROOM ENDPOINTS ====================
 
 @app.get("/rooms", response_model=List[RoomResponse])
-def get_rooms():
+async def get_rooms(request: Request):
     """Get all rooms"""
-    connection = get_db_connection()
-    if not connection:
-        raise HTTPException(status_code=500, detail="Database connection failed")
-    
-    try:
-        cursor = connection.cursor(cursor_factory=RealDictCursor)
-        cursor.execute("SELECT * FROM rooms")
-        rooms = cursor.fetchall()
-        return rooms
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        cursor.close()
-        close_db_connection(connection)
+    # The list is cached already encoded, so a hit costs no serialization at all
+    cached = room_cache.get("rooms")
+    if cached is not MISSING:
+        versions, body = cached
+        headers = check_not_modified(request, None, make_etag(request, versions))
+        return json_response(headers=headers, body=body)
+
+    generation = room_cache.generation
+    async with get_async_connection() as connection:
+        try:
+            async with connection.cursor(row_factory=dict_row) as cursor:
+                versions = await fetch_versions(cursor, "rooms")
+                headers = check_not_modified(request, None, make_etag(request, versions))
+                await cursor.execute(f"SELECT {ROOM_COLUMNS} FROM rooms")
+                body = dumps(await cursor.fetchall())
+                room_cache.set("rooms", (versions, body), generation)
+                return json_response(headers=headers, body=body)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/rooms/search", response_model=List[RoomResponse])
+async def search_rooms(request: Request, q: str = Query("", max_length=20),
+                       limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT)):
+    """Typeahead: the first rooms whose number starts with q, in room number order"""
+    cache_key = ("room_search", q, limit)
+    cached = room_cache.get(cache_key)
+    if cached is not MISSING:
+        versions, body = cached
+        headers = check_not_modified(request, None, make_etag(request, versions))
+        return json_response(headers=headers, body=body)
+
+    generation = room_cache.generation
+    async with get_async_connection() as connection:
+        try:
+            async with connection.cursor(row_factory=dict_row) as cursor:
+                versions = await fetch_versions(cursor, "rooms")
+                headers = check_not_modified(request, None, make_etag(request, versions))
+                # Served by idx_room_number_pattern
+                await cursor.execute(f"""
+                    SELECT {ROOM_COLUMNS} FROM rooms
+                    WHERE room_number LIKE %s
+                    ORDER BY room_number LIMIT %s
+                """, (like_prefix(q), limit))
+                body = dumps(await cursor.fetchall())
+                room_cache.set(cache_key, (versions, body), generation)
+                return json_response(headers=headers, body=body)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/rooms/{room_id}", response_model=RoomResponse)
-def get_room(room_id: int):
+async def get_room(room_id: int, request: Request, response: Response):
     """Get a specific room by ID"""
-    connection = get_db_connection()
-    if not connection:
-        raise HTTPException(status_code=500, detail="Database connection failed")
-    
-    try:
-        cursor = connection.cursor(cursor_factory=RealDictCursor)
-        cursor.execute("SELECT * FROM rooms WHERE id = %s", (room_id,))
-        room = cursor.fetchone()
-        if not room:
-            raise HTTPException(status_code=404, detail="Room not found")
+    cached = room_cache.get(("room", room_id))
+    if cached is not MISSING:
+        versions, room = cached
+        check_not_modified(request, response, make_etag(request, versions))
         return room
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        cursor.close()
-        close_db_connection(connection)
+
+    generation = room_cache.generation
+    async with get_async_connection() as connection:
+        try:
+            async with connection.cursor(row_factory=dict_row) as cursor:
+                versions = await fetch_versions(cursor, "rooms")
+                check_not_modified(request, response, make_etag(request, versions))
+                await cursor.execute("SELECT * FROM rooms WHERE id = %s", (room_id,))
+                room = await cursor.fetchone()
+                if not room:
+                    raise HTTPException(status_code=404, detail="Room not found")
+                room_cache.set(("room", room_id), (versions, room), generation)
+                return room
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/rooms", response_model=RoomResponse)
-def create_room(room: Room):
+async def create_room(room: Room):
     """Create a new room"""
-    connection = get_db_connection()
-    if not connection:
-        raise HTTPException(status_code=500, detail="Database connection failed")
-    
-    try:
-        cursor = connection.cursor(cursor_factory=RealDictCursor)
-        query = """
-            INSERT INTO rooms (room_number, room_type, price, status)
-            VALUES (%s, %s, %s, %s)
-            RETURNING *
-        """
-        cursor.execute(query, (room.room_number, room.room_type, room.price, room.status))
-        new_room = cursor.fetchone()
-        connection.commit()
-        return new_room
-    except Exception as e:
-        connection.rollback()
-        raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        cursor.close()
-        close_db_connection(connection)
+    async with get_async_connection() as connection:
+        try:
+            async with connection.cursor(row_factory=dict_row) as cursor:
+                query = """
+                    INSERT INTO rooms (room_number, room_type, price, status)
+                    VALUES (%s, %s, %s, %s)
+                    RETURNING *
+                """
+                await cursor.execute(query, (room.room_number, room.room_type, room.price, room.status))
+                new_room = await cursor.fetchone()
+                await connection.commit()
+                room_cache.clear()
+                return new_room
+        except Exception as e:
+            await connection.rollback()
+            raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/rooms/bulk", response_model=BulkImportResult)
+async def bulk_import_rooms(request: Request,
+                            import_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$")):
+    """Create rooms from a CSV or NDJSON upload.
+
+    Valid rows are COPYed into a staging table and merged with one INSERT.
+    Rows that fail validation or reuse a room number are reported by line.
+    """
+    rows, parse_errors = await parse_upload(request, import_format, Room)
+    async with get_async_connection() as connection:
+        try:
+            async with connection.cursor(row_factory=dict_row) as cursor:
+                db_errors = await stage_rows(cursor, """
+                    CREATE TEMP TABLE room_import (
+                        line INTEGER, room_number VARCHAR(10), room_type VARCHAR(50),
+                        price INTEGER, status VARCHAR(20), error TEXT
+                    ) ON COMMIT DROP
+                """, "room_import", ["room_number", "room_type", "price", "status"], rows, ["""
+                    UPDATE room_import s SET error = c.error
+                    FROM (
+                        SELECT line, CASE
+                            WHEN EXISTS (SELECT 1 FROM rooms r WHERE r.room_number = i.room_number)
+                                THEN 'Room number ' || room_number || ' already exists'
+                            WHEN row_number() OVER (PARTITION BY room_number ORDER BY line) > 1
+                                THEN 'Room number ' || room_number || ' appears earlier in the upload'
+                        END AS error
+                        FROM room_import i
+                    ) c
+                    WHERE c.line = s.line AND c.error IS NOT NULL
+                """, """
+                    WITH inserted AS (
+                        INSERT INTO rooms (room_number, room_type, price, status)
+                        SELECT room_number, room_type, price, status FROM room_import
+                        WHERE error IS NULL ORDER BY line
+                        ON CONFLICT (room_number) DO NOTHING
+                        RETURNING room_number
+                    )
+                    UPDATE room_import s SET error = 'Room number ' || s.room_number || ' already exists'
+                    WHERE s.error IS NULL
+                    AND NOT EXISTS (SELECT 1 FROM inserted i WHERE i.room_number = s.room_number)
+                """])
+                await connection.commit()
+                room_cache.clear()
+                return import_result(rows, parse_errors, db_errors)
+        except Exception as e:
+            await connection.rollback()
+            raise HTTPException(status_code=500, detail=str(e))
 
 @app.put("/rooms/{room_id}", response_model=RoomResponse)
-def update_room(room_id: int, room: Room):
+async def update_room(room_id: int, room: Room, background_tasks: BackgroundTasks):
     """Update a room"""
-    connection = get_db_connection()
-    if not connection:
-        raise HTTPException(status_code=500, detail="Database connection failed")
-    
-    try:
-        cursor = connection.cursor(cursor_factory=RealDictCursor)
-        query = """
-            UPDATE rooms 
-            SET room_number = %s, room_type = %s, price = %s, status = %s
-            WHERE id = %s
-        """
-        cursor.execute(query, (room.room_number, room.room_type, room.price, room.status, room_id))
-        connection.commit()
-        
-        if cursor.rowcount == 0:
-            raise HTTPException(status_code=404, detail="Room not found")
-        
-        cursor.execute("SELECT * FROM rooms WHERE id = %s", (room_id,))
-        updated_room = cursor.fetchone()
-        return updated_room
-    except HTTPException:
-        raise
-    except Exception as e:
-        connection.rollback()
-        raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        cursor.close()
-        close_db_connection(connection)
+    async with get_async_connection() as connection:
+        try:
+            async with connection.cursor(row_factory=dict_row) as cursor:
+                # Also return the old room type and the span of the room's bookings:
+                # a new type moves those stays to another row of the daily rollup
+                query = """
+                    UPDATE rooms r
+                    SET room_number = %s, room_type = %s, price = %s, status = %s
+                    FROM (SELECT id, room_type FROM rooms WHERE id = %s FOR UPDATE) old
+                    WHERE r.id = old.id
+                    RETURNING r.*, old.room_type AS old_room_type,
+                        (SELECT MIN(check_in_date) FROM bookings WHERE room_id = r.id) AS first_day,
+                        (SELECT MAX(check_out_date) FROM bookings WHERE room_id = r.id) AS last_day
+                """
+                await cursor.execute(query, (room.room_number, room.room_type, room.price, room.status, room_id))
+                updated_room = await cursor.fetchone()
+                if not updated_room:
+                    raise HTTPException(status_code=404, detail="Room not found")
+
+                await connection.commit()
+                room_cache.clear()
+                old_room_type = updated_room.pop("old_room_type")
+                stays = (updated_room.pop("first_day"), updated_room.pop("last_day"))
+                if old_room_type != room.room_type and stays[0]:
+                    background_tasks.add_task(refresh_daily_stats, stays)
+                return updated_room
+        except HTTPException:
+            raise
+        except Exception as e:
+            await connection.rollback()
+            raise HTTPException(status_code=500, detail=str(e))
+
+# Deletes a room or guest ({table}) and returns the span of the bookings
+# its ON DELETE CASCADE removes along with it
+DELETE_WITH_STAYS = """
+    WITH stays AS (
+        SELECT MIN(check_in_date) AS first_day, MAX(check_out_date) AS last_day,
+               ARRAY_AGG(DISTINCT room_id) AS room_ids
+        FROM bookings WHERE {column} = %(id)s
+    ), deleted AS (
+        DELETE FROM {table} WHERE id = %(id)s RETURNING id
+    )
+    SELECT stays.first_day, stays.last_day, stays.room_ids FROM deleted, stays
+"""
 
 @app.delete("/rooms/{room_id}")
-def delete_room(room_id: int):
-    """Delete a room"""
-    connection = get_db_connection()
-    if not connection:
-        raise HTTPException(status_code=500, detail="Database connection failed")
-    
-    try:
-        cursor = connection.cursor()
-        cursor.execute("DELETE FROM rooms WHERE id = %s", (room_id,))
-        connection.commit()
-        
-        if cursor.rowcount == 0:
-            raise HTTPException(status_code=404, detail="Room not found")
-        
-        return {"message": "Room deleted successfully"}
-    except HTTPException:
-        raise
-    except Exception as e:
-        connection.rollback()
-        raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        cursor.close()
-        close_db_connection(connection)
+async def delete_room(room_id: int, background_tasks: BackgroundTasks):
+    """Delete a room and its bookings"""
+    async with get_async_connection() as connection:
+        try:
+            async with connection.cursor() as cursor:
+                await cursor.execute(DELETE_WITH_STAYS.format(table="rooms", column="room_id"), {"id": room_id})
+                stays = await cursor.fetchone()
+                await connection.commit()
+                room_cache.clear()
+
+                if stays is None:
+                    raise HTTPException(status_code=404, detail="Room not found")
+
+                first_day, last_day, _ = stays
+                if first_day:
+                    background_tasks.add_task(refresh_daily_stats, (first_day, last_day))
+                return {"message": "Room deleted successfully"}
+        except HTTPException:
+            raise
+        except Exception as e:
+            await connection.rollback()
+            raise HTTPException(status_code=500, detail=str(e))
 
 # ==================== GUEST ENDPOINTS ====================
 
-@app.get("/guests", response_model=List[GuestResponse])
-def get_guests():
-    """Get all guests"""
-    connection = get_db_connection()
-    if not connection:
-        raise HTTPException(status_code=500, detail="Database connection failed")
-    
-    try:
-        cursor = connection.cursor(cursor_factory=RealDictCursor)
-        cursor.execute("SELECT * FROM guests ORDER BY created_at DESC")
-        guests = cursor.fetchall()
-        return guests
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        cursor.close()
-        close_db_connection(connection)
+@app.get("/guests", response_model=GuestPage)
+async def get_guests(request: Request,
+                     limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                     page_cursor: Optional[str] = Query(None, alias="cursor"),
+                     name: Optional[str] = None,
+                     page_format: str = Query("json", alias="format", pattern="^(json|columnar|arrow)$")):
+    """Get one page of guests, newest first, optionally filtered by name.
+
+    format=columnar or arrow send the page column by column (see fast_json.py).
+    """
+    conditions = []
+    params = {"limit": limit + 1}
+    if name:
+        conditions.append("(first_name || ' ' || last_name) ILIKE %(name)s")
+        params["name"] = "%" + like_prefix(name)
+    if page_cursor:
+        try:
+            params["after_created_at"], params["after_id"] = decode_cursor(page_cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        conditions.append("(created_at, id) < (%(after_created_at)s, %(after_id)s)")
+
+    async with get_async_connection() as connection:
+        try:
+            async with connection.cursor(row_factory=dict_row) as cursor:
+                headers = await check_etag(request, None, cursor, "guests")
+                query = f"SELECT {GUEST_COLUMNS} FROM guests"
+                if conditions:
+                    query += " WHERE " + " AND ".join(conditions)
+                query += " ORDER BY created_at DESC, id DESC LIMIT %(limit)s"
+                await cursor.execute(query, params)
+                guests = await cursor.fetchall()
+                return page_response(build_page(guests, limit), headers, page_format, GuestResponse)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/guests/search", response_model=List[GuestResponse])
+async def search_guests(request: Request, q: str = Query("", max_length=100),
+                        limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT)):
+    """Typeahead: the best few guests whose name, email or phone match q.
+
+    Names starting with q come first. Below 3 characters only prefixes
+    match, above that q can appear anywhere. An empty q gives the newest guests.
+    Other matches are ranked among the first GUEST_SEARCH_CANDIDATES found.
+    """
+    prefix = like_prefix(q.strip())
+    params = {"prefix": prefix, "pattern": prefix if len(q.strip()) < 3 else "%" + prefix, "limit": limit,
+              "candidates": GUEST_SEARCH_CANDIDATES}
+    async with get_async_connection() as connection:
+        try:
+            async with connection.cursor(row_factory=dict_row) as cursor:
+                headers = await check_etag(request, None, cursor, "guests")
+                if q.strip():
+                    # Name prefixes are read in order from idx_guest_name_prefix and stop at
+                    # limit. Only when they don't fill it are other matches looked up in the
+                    # trigram indexes (idx_guest_*_trgm), capped before they're sorted.
+                    query = f"""
+                        WITH prefixed AS (
+                            SELECT {GUEST_COLUMNS}, 0 AS rank, lower(first_name || ' ' || last_name) COLLATE "C" AS name
+                            FROM guests
+                            WHERE lower(first_name || ' ' || last_name) COLLATE "C" LIKE lower(%(prefix)s)
+                            ORDER BY lower(first_name || ' ' || last_name) COLLATE "C", id
+                            LIMIT %(limit)s
+                        )
+                        SELECT {GUEST_COLUMNS} FROM (
+                            SELECT * FROM prefixed
+                            UNION ALL
+                            SELECT {GUEST_COLUMNS}, 1, lower(first_name || ' ' || last_name) COLLATE "C"
+                            FROM (
+                                SELECT {GUEST_COLUMNS} FROM guests
+                                WHERE (SELECT count(*) FROM prefixed) < %(limit)s
+                                AND ((first_name || ' ' || last_name) ILIKE %(pattern)s
+                                     OR email ILIKE %(pattern)s
+                                     OR phone ILIKE %(pattern)s)
+                                AND lower(first_name || ' ' || last_name) NOT LIKE lower(%(prefix)s)
+                                LIMIT %(candidates)s
+                            ) candidates
+                        ) matches
+                        ORDER BY rank, name, id
+                        LIMIT %(limit)s
+                    """
+                else:
+                    query = f"SELECT {GUEST_COLUMNS} FROM guests ORDER BY created_at DESC, id DESC LIMIT %(limit)s"
+                await cursor.execute(query, params)
+                return json_response(await cursor.fetchall(), headers)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/guests/{guest_id}", response_model=GuestResponse)
-def get_guest(guest_id: int):
+async def get_guest(guest_id: int, request: Request, response: Response):
     """Get a specific guest by ID"""
-    connection = get_db_connection()
-    if not connection:
-        raise HTTPException(status_code=500, detail="Database connection failed")
-    
-    try:
-        cursor = connection.cursor(cursor_factory=RealDictCursor)
-        cursor.execute("SELECT * FROM guests WHERE id = %s", (guest_id,))
-        guest = cursor.fetchone()
-        if not guest:
-            raise HTTPException(status_code=404, detail="Guest not found")
-        return guest
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        cursor.close()
-        close_db_connection(connection)
+    async with get_async_connection() as connection:
+        try:
+            async with connection.cursor(row_factory=dict_row) as cursor:
+                await check_etag(request, response, cursor, "guests")
+                await cursor.execute("SELECT * FROM guests WHERE id = %s", (guest_id,))
+                guest = await cursor.fetchone()
+                if not guest:
+                    raise HTTPException(status_code=404, detail="Guest not found")
+                return guest
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/guests", response_model=GuestResponse)
-def create_guest(guest: Guest):
+async def create_guest(guest: Guest):
     """Create a new guest"""
-    print(f"Received guest data: {guest}")  # Debug logging
-    connection = get_db_connection()
-    if not connection:
-        raise HTTPException(status_code=500, detail="Database connection failed")
-    
-    try:
-        cursor = connection.cursor(cursor_factory=RealDictCursor)
-        query = """
-            INSERT INTO guests (first_name, last_name, email, phone, address)
-            VALUES (%s, %s, %s, %s, %s)
-            RETURNING *
-        """
-        cursor.execute(query, (guest.first_name, guest.last_name, guest.email, guest.phone, guest.address))
-        new_guest = cursor.fetchone()
-        connection.commit()
-        return new_guest
-    except Exception as e:
-        connection.rollback()
-        error_msg = str(e)
-        print(f"Error creating guest: {type(e).__name__}: {error_msg}")  # Better error logging
-        
-        # Handle unique constraint violation for email
-        if "unique constraint" in error_msg.lower() or "duplicate key" in error_msg.lower():
-            if "email" in error_msg.lower():
-                raise HTTPException(status_code=400, detail=f"Email '{guest.email}' is already registered")
-        
-        raise HTTPException(status_code=500, detail=f"{type(e).__name__}: {error_msg}")
-    finally:
-        cursor.close()
-        close_db_connection(connection)
+    async with get_async_connection() as connection:
+        try:
+            async with connection.cursor(row_factory=dict_row) as cursor:
+                query = """
+                    INSERT INTO guests (first_name, last_name, email, phone, address)
+                    VALUES (%s, %s, %s, %s, %s)
+                    RETURNING *
+                """
+                await cursor.execute(query, (guest.first_name, guest.last_name, guest.email, guest.phone, guest.address))
+                new_guest = await cursor.fetchone()
+                await connection.commit()
+                return new_guest
+        except Exception as e:
+            await connection.rollback()
+            error_msg = str(e)
+
+            # Handle unique constraint violation for email
+            if "unique constraint" in error_msg.lower() or "duplicate key" in error_msg.lower():
+                if "email" in error_msg.lower():
+                    raise HTTPException(status_code=400, detail=f"Email '{guest.email}' is already registered")
+
+            raise HTTPException(status_code=500, detail=f"{type(e).__name__}: {error_msg}")
+
+@app.post("/guests/bulk", response_model=BulkImportResult)
+async def bulk_import_guests(request: Request,
+                             import_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$")):
+    """Create guests from a CSV or NDJSON upload.
+
+    Valid rows are COPYed into a staging table and merged with one INSERT.
+    Rows that fail validation or reuse a registered email are reported by line.
+    """
+    rows, parse_errors = await parse_upload(request, import_format, Guest)
+    async with get_async_connection() as connection:
+        try:
+            async with connection.cursor(row_factory=dict_row) as cursor:
+                db_errors = await stage_rows(cursor, """
+                    CREATE TEMP TABLE guest_import (
+                        line INTEGER, first_name VARCHAR(50), last_name VARCHAR(50),
+                        email VARCHAR(100), phone VARCHAR(20), address TEXT, error TEXT
+                    ) ON COMMIT DROP
+                """, "guest_import", ["first_name", "last_name", "email", "phone", "address"], rows, ["""
+                    UPDATE guest_import s SET error = c.error
+                    FROM (
+                        SELECT line, CASE
+                            WHEN EXISTS (SELECT 1 FROM guests g WHERE g.email = i.email)
+                                THEN 'Email ' || quote_literal(email) || ' is already registered'
+                            WHEN row_number() OVER (PARTITION BY email ORDER BY line) > 1
+                                THEN 'Email ' || quote_literal(email) || ' appears earlier in the upload'
+                        END AS error
+                        FROM guest_import i
+                    ) c
+                    WHERE c.line = s.line AND c.error IS NOT NULL
+                """, """
+                    WITH inserted AS (
+                        INSERT INTO guests (first_name, last_name, email, phone, address)
+                        SELECT first_name, last_name, email, phone, address FROM guest_import
+                        WHERE error IS NULL ORDER BY line
+                        ON CONFLICT (email) DO NOTHING
+                        RETURNING email
+                    )
+                    UPDATE guest_import s SET error = 'Email ' || quote_literal(s.email) || ' is already registered'
+                    WHERE s.error IS NULL
+                    AND NOT EXISTS (SELECT 1 FROM inserted i WHERE i.email = s.email)
+                """])
+                await connection.commit()
+                return import_result(rows, parse_errors, db_errors)
+        except Exception as e:
+            await connection.rollback()
+            raise HTTPException(status_code=500, detail=str(e))
 
 @app.put("/guests/{guest_id}", response_model=GuestResponse)
-def update_guest(guest_id: int, guest: Guest):
+async def update_guest(guest_id: int, guest: Guest):
     """Update a guest"""
-    connection = get_db_connection()
-    if not connection:
-        raise HTTPException(status_code=500, detail="Database connection failed")
-    
-    try:
-        cursor = connection.cursor(cursor_factory=RealDictCursor)
-        query = """
-            UPDATE guests 
-            SET first_name = %s, last_name = %s, email = %s, phone = %s, address = %s
-            WHERE id = %s
-        """
-        cursor.execute(query, (guest.first_name, guest.last_name, guest.email, guest.phone, guest.address, guest_id))
-        connection.commit()
-        
-        if cursor.rowcount == 0:
-            raise HTTPException(status_code=404, detail="Guest not found")
-        
-        cursor.execute("SELECT * FROM guests WHERE id = %s", (guest_id,))
-        updated_guest = cursor.fetchone()
-        return updated_guest
-    except HTTPException:
-        raise
-    except Exception as e:
-        connection.rollback()
-        raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        cursor.close()
-        close_db_connection(connection)
+    async with get_async_connection() as connection:
+        try:
+            async with connection.cursor(row_factory=dict_row) as cursor:
+                query = """
+                    UPDATE guests
+                    SET first_name = %s, last_name = %s, email = %s, phone = %s, address = %s
+                    WHERE id = %s
+                    RETURNING *
+                """
+                await cursor.execute(query, (guest.first_name, guest.last_name, guest.email, guest.phone, guest.address, guest_id))
+                updated_guest = await cursor.fetchone()
+                if not updated_guest:
+                    raise HTTPException(status_code=404, detail="Guest not found")
+
+                await connection.commit()
+                return updated_guest
+        except HTTPException:
+            raise
+        except Exception as e:
+            await connection.rollback()
+            raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/guests/{guest_id}")
-def delete_guest(guest_id: int):
-    """Delete a guest"""
-    connection = get_db_connection()
-    if not connection:
-        raise HTTPException(status_code=500, detail="Database connection failed")
-    
-    try:
-        cursor = connection.cursor()
-        cursor.execute("DELETE FROM guests WHERE id = %s", (guest_id,))
-        connection.commit()
-        
-        if cursor.rowcount == 0:
-            raise HTTPException(status_code=404, detail="Guest not found")
-        
-        return {"message": "Guest deleted successfully"}
-    except HTTPException:
-        raise
-    except Exception as e:
-        connection.rollback()
-        raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        cursor.close()
-        close_db_connection(connection)
+async def delete_guest(guest_id: int, background_tasks: BackgroundTasks):
+    """Delete a guest and their bookings"""
+    async with get_async_connection() as connection:
+        try:
+            async with connection.cursor() as cursor:
+                await cursor.execute(DELETE_WITH_STAYS.format(table="guests", column="guest_id"), {"id": guest_id})
+                stays = await cursor.fetchone()
+                await connection.commit()
+
+                if stays is None:
+                    raise HTTPException(status_code=404, detail="Guest not found")
+
+                first_day, last_day, room_ids = stays
+                if first_day:
+                    background_tasks.add_task(refresh_daily_stats, (first_day, last_day))
+                    background_tasks.add_task(sync_rooms, room_ids)
+                return {"message": "Guest deleted successfully"}
+        except HTTPException:
+            raise
+        except Exception as e:
+            await connection.rollback()
+            raise HTTPException(status_code=500, detail=str(e))
 
 # ==================== BOOKING ENDPOINTS ====================
 
-@app.get("/bookings", response_model=List[BookingDetail])
-def get_bookings():
-    """Get all bookings with details"""
-    connection = get_db_connection()
-    if not connection:
-        raise HTTPException(status_code=500, detail="Database connection failed")
-    
+@app.get("/bookings", response_model=BookingPage)
+async def get_bookings(request: Request,
+                       limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                       page_cursor: Optional[str] = Query(None, alias="cursor"),
+                       status: Optional[str] = None, room_type: Optional[str] = None,
+                       guest_name: Optional[str] = None,
+                       date_from: Optional[date] = Query(None, alias="from"),
+                       date_to: Optional[date] = Query(None, alias="to"),
+                       page_format: str = Query("json", alias="format", pattern="^(json|columnar|arrow)$")):
+    """Get one page of bookings with details, newest first.
+
+    from/to keep bookings whose stay overlaps that date window. format works
+    as for GET /guests.
+    """
+    check_date_order(date_from, date_to)
+    conditions = []
+    params = {"limit": limit + 1, "date_from": date_from, "date_to": date_to}
+    if status:
+        conditions.append("b.status = %(status)s")
+        params["status"] = status
+    if room_type:
+        conditions.append("r.room_type = %(room_type)s")
+        params["room_type"] = room_type
+    if guest_name:
+        conditions.append("(g.first_name || ' ' || g.last_name) ILIKE %(guest_name)s")
+        params["guest_name"] = "%" + like_prefix(guest_name)
+    if date_from or date_to:
+        conditions.append("b.stay && daterange(%(date_from)s, %(date_to)s, '[]')")
+    if page_cursor:
+        try:
+            params["after_created_at"], params["after_id"] = decode_cursor(page_cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        conditions.append("(b.created_at, b.id) < (%(after_created_at)s, %(after_id)s)")
+
+    async with get_async_connection() as connection:
+        try:
+            async with connection.cursor(row_factory=dict_row) as cursor:
+                headers = await check_etag(request, None, cursor, "bookings", "guests", "rooms")
+                # Selects exactly the BookingDetail fields, which are encoded as-is
+                query = """
+                    SELECT
+                        b.id as booking_id,
+                        b.guest_id,
+                        b.room_id,
+                        g.first_name || ' ' || g.last_name as guest_name,
+                        r.room_number,
+                        r.room_type,
+                        b.check_in_date,
+                        b.check_out_date,
+                        b.total_amount,
+                        b.status,
+                        b.created_at
+                    FROM bookings b
+                    JOIN guests g ON b.guest_id = g.id
+                    JOIN rooms r ON b.room_id = r.id
+                """
+                if conditions:
+                    query += " WHERE " + " AND ".join(conditions)
+                query += " ORDER BY b.created_at DESC, b.id DESC LIMIT %(limit)s"
+                await cursor.execute(query, params)
+                bookings = await cursor.fetchall()
+                return page_response(build_page(bookings, limit, id_key="booking_id"), headers, page_format, BookingDetail)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+class ReleasingStreamingResponse(StreamingResponse):
+    """StreamingResponse that closes its body and calls release() however sending ends.
+
+    That includes a client that disconnects, or a send that fails, before
+    the body was ever iterated.
+    """
+
+    def __init__(self, content, release, **kwargs):
+        super().__init__(content, **kwargs)
+        self.release = release
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            try:
+                await self.body_iterator.aclose()
+            finally:
+                await self.release()
+
+@app.get("/bookings/export")
+async def export_bookings(request: Request,
+                          export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+                          status: Optional[str] = None, room_type: Optional[str] = None,
+                          guest_name: Optional[str] = None,
+                          date_from: Optional[date] = Query(None, alias="from"),
+                          date_to: Optional[date] = Query(None, alias="to")):
+    """Stream every matching booking as NDJSON or CSV.
+
+    Takes the same filters as GET /bookings. Rows are read from a server-side cursor in EXPORT_BATCH_SIZE batches and
+    written out batch by batch, so memory stays flat however many rows match.
+    """
+    check_date_order(date_from, date_to)
+    conditions = []
+    params = {"status": status, "room_type": room_type, "date_from": date_from, "date_to": date_to}
+    if status:
+        conditions.append("b.status = %(status)s")
+    if room_type:
+        conditions.append("r.room_type = %(room_type)s")
+    if guest_name:
+        conditions.append("(g.first_name || ' ' || g.last_name) ILIKE %(guest_name)s")
+        params["guest_name"] = "%" + like_prefix(guest_name)
+    if date_from or date_to:
+        conditions.append("b.stay && daterange(%(date_from)s, %(date_to)s, '[]')")
+
+    query = """
+        SELECT
+            b.id as booking_id,
+            b.guest_id,
+            b.room_id,
+            g.first_name || ' ' || g.last_name as guest_name,
+            r.room_number,
+            r.room_type,
+            b.check_in_date,
+            b.check_out_date,
+            b.total_amount,
+            b.status,
+            b.created_at
+        FROM bookings b
+        JOIN guests g ON b.guest_id = g.id
+        JOIN rooms r ON b.room_id = r.id
+    """
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY b.id"
+
+    # Check the connection out before answering so pool exhaustion is still a 503
+    connection_scope = AsyncExitStack()
+    connection = await connection_scope.enter_async_context(get_async_connection())
     try:
-        cursor = connection.cursor(cursor_factory=RealDictCursor)
-        query = """
-            SELECT 
-                b.id as booking_id,
-                g.first_name || ' ' || g.last_name as guest_name,
-                r.room_number,
-                r.room_type,
-                b.check_in_date,
-                b.check_out_date,
-                b.total_amount,
-                b.status,
-                b.created_at
-            FROM bookings b
-            JOIN guests g ON b.guest_id = g.id
-            JOIN rooms r ON b.room_id = r.id
-            ORDER BY b.created_at DESC
-        """
-        cursor.execute(query)
-        bookings = cursor.fetchall()
-        return bookings
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        cursor.close()
-        close_db_connection(connection)
+        async with connection.cursor(row_factory=dict_row) as cursor:
+            etag_headers = await check_etag(request, None, cursor, "bookings", "guests", "rooms")
+    except BaseException:
+        await connection_scope.aclose()
+        raise
+
+    async def generate():
+        async with connection.cursor(name="bookings_export") as cursor:
+            await cursor.execute(query, params)
+            columns = [column.name for column in cursor.description]
+            if export_format == "csv":
+                yield encode_csv([columns])
+            while True:
+                rows = await cursor.fetchmany(EXPORT_BATCH_SIZE)
+                if not rows:
+                    break
+                if export_format == "csv":
+                    yield encode_csv(rows)
+                else:
+                    yield "".join(json.dumps(dict(zip(columns, row)), default=to_json) + "\n" for row in rows)
+
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    return ReleasingStreamingResponse(generate(), connection_scope.aclose, media_type=media_type, headers={
+        "Content-Disposition": f'attachment; filename="bookings.{export_format}"',
+        **etag_headers,
+    })
 
 @app.get("/bookings/{booking_id}", response_model=BookingDetail)
-def get_booking(booking_id: int):
+async def get_booking(booking_id: int, request: Request, response: Response):
     """Get a specific booking by ID"""
-    connection = get_db_connection()
-    if not connection:
-        raise HTTPException(status_code=500, detail="Database connection failed")
-    
-    try:
-        cursor = connection.cursor(cursor_factory=RealDictCursor)
-        query = """
-            SELECT 
-                b.id as booking_id,
-                g.first_name || ' ' || g.last_name as guest_name,
-                r.room_number,
-                r.room_type,
-                b.check_in_date,
-                b.check_out_date,
-                b.total_amount,
-                b.status,
-                b.created_at
-            FROM bookings b
-            JOIN guests g ON b.guest_id = g.id
-            JOIN rooms r ON b.room_id = r.id
-            WHERE b.id = %s
-        """
-        cursor.execute(query, (booking_id,))
-        booking = cursor.fetchone()
-        if not booking:
-            raise HTTPException(status_code=404, detail="Booking not found")
-        return booking
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        cursor.close()
-        close_db_connection(connection)
+    async with get_async_connection() as connection:
+        try:
+            async with connection.cursor(row_factory=dict_row) as cursor:
+                await check_etag(request, response, cursor, "bookings", "guests", "rooms")
+                query = """
+                    SELECT
+                        b.id as booking_id,
+                        b.guest_id,
+                        b.room_id,
+                        g.first_name || ' ' || g.last_name as guest_name,
+                        r.room_number,
+                        r.room_type,
+                        b.check_in_date,
+                        b.check_out_date,
+                        b.total_amount,
+                        b.status,
+                        b.created_at
+                    FROM bookings b
+                    JOIN guests g ON b.guest_id = g.id
+                    JOIN rooms r ON b.room_id = r.id
+                    WHERE b.id = %s
+                """
+                await cursor.execute(query, (booking_id,))
+                booking = await cursor.fetchone()
+                if not booking:
+                    raise HTTPException(status_code=404, detail="Booking not found")
+                return booking
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/bookings", response_model=BookingResponse)
-def create_booking(booking: Booking):
+async def create_booking(booking: Booking, background_tasks: BackgroundTasks):
     """Create a new booking"""
-    connection = get_db_connection()
-    if not connection:
-        raise HTTPException(status_code=500, detail="Database connection failed")
-    
-    try:
-        cursor = connection.cursor(cursor_factory=RealDictCursor)
-        
-        # Check if room is available
-        cursor.execute("SELECT status FROM rooms WHERE id = %s", (booking.room_id,))
-        room = cursor.fetchone()
-        if not room:
-            raise HTTPException(status_code=404, detail="Room not found")
-        if room['status'] != 'available':
-            raise HTTPException(status_code=400, detail="Room is not available")
-        
-        # Check for date conflicts
-        conflict_query = """
-            SELECT COUNT(*) as count FROM bookings
-            WHERE room_id = %s 
-            AND status IN ('confirmed', 'checked-in')
-            AND NOT (check_out_date <= %s OR check_in_date >= %s)
-        """
-        cursor.execute(conflict_query, (booking.room_id, booking.check_in_date, booking.check_out_date))
-        conflict = cursor.fetchone()
-        if conflict and conflict['count'] > 0:
-            raise HTTPException(status_code=400, detail="Room is already booked for the selected dates")
-        
-        # Create booking
-        query = """
-            INSERT INTO bookings (guest_id, room_id, check_in_date, check_out_date, total_amount, status)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            RETURNING id
-        """
-        cursor.execute(query, (booking.guest_id, booking.room_id, booking.check_in_date, 
-                              booking.check_out_date, booking.total_amount, booking.status))
-        
-        booking_id = cursor.fetchone()["id"]
-        
-        # Update room status based on booking status and dates
-        from datetime import date as date_type
-        today = date_type.today()
-        check_in_date = booking.check_in_date if isinstance(booking.check_in_date, date_type) else date_type.fromisoformat(str(booking.check_in_date))
-        
-        if booking.status == 'checked-in' or (booking.status == 'confirmed' and check_in_date <= today):
-            cursor.execute("UPDATE rooms SET status = 'occupied' WHERE id = %s", (booking.room_id,))
-        
-        connection.commit()
-        
-        cursor.execute("SELECT * FROM bookings WHERE id = %s", (booking_id,))
-        new_booking = cursor.fetchone()
-        
-        if not new_booking:
-            raise HTTPException(status_code=500, detail="Failed to retrieve created booking")
-        
-        return new_booking
-    except HTTPException:
-        raise
-    except Exception as e:
-        connection.rollback()
-        raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        cursor.close()
-        close_db_connection(connection)
+    # Checked up front: the generated stay range fails before bookings_valid_dates would
+    if booking.check_out_date <= booking.check_in_date:
+        raise HTTPException(status_code=400, detail="Check-out date must be after check-in date")
+    check_booking_status(booking.status)
+    async with get_async_connection() as connection:
+        try:
+            async with connection.cursor(row_factory=dict_row) as cursor:
+                # Insert the booking unless the room is under maintenance. Date
+                # conflicts are rejected by the bookings_no_overlap constraint.
+                query = """
+                    WITH room AS (
+                        SELECT id, status FROM rooms WHERE id = %(room_id)s
+                    ), new_booking AS (
+                        INSERT INTO bookings (guest_id, room_id, check_in_date, check_out_date, total_amount, status)
+                        SELECT %(guest_id)s, id, %(check_in_date)s, %(check_out_date)s, %(total_amount)s, %(status)s
+                        FROM room
+                        WHERE status <> 'maintenance'
+                        RETURNING *
+                    )
+                    SELECT new_booking.* FROM room LEFT JOIN new_booking ON true
+                """
+                await cursor.execute(query, booking.model_dump())
+                new_booking = await cursor.fetchone()
+
+                if not new_booking:
+                    raise HTTPException(status_code=404, detail="Room not found")
+                if new_booking['id'] is None:
+                    raise HTTPException(status_code=400, detail="Room is under maintenance")
+
+                await connection.commit()
+                background_tasks.add_task(refresh_daily_stats, (booking.check_in_date, booking.check_out_date))
+                background_tasks.add_task(sync_rooms, [booking.room_id])
+                return new_booking
+        except HTTPException:
+            raise
+        except errors.ExclusionViolation:
+            await connection.rollback()
+            raise HTTPException(status_code=409, detail="Room is already booked for the selected dates")
+        except errors.CheckViolation:
+            await connection.rollback()
+            raise HTTPException(status_code=400, detail="Check-out date must be after check-in date")
+        except errors.ForeignKeyViolation:
+            await connection.rollback()
+            raise HTTPException(status_code=404, detail="Guest not found")
+        except Exception as e:
+            await connection.rollback()
+            raise HTTPException(status_code=500, detail=str(e))
+
+# The batch's bookings as rows, numbered in request order
+BATCH_REQUESTED = """
+    requested AS (
+        SELECT * FROM unnest(%(guest_id)s::int[], %(room_id)s::int[], %(check_in_date)s::date[],
+                             %(check_out_date)s::date[], %(total_amount)s::int[], %(status)s::text[])
+                      WITH ORDINALITY AS r(guest_id, room_id, check_in_date, check_out_date,
+                                           total_amount, status, n)
+    )
+"""
+
+@app.post("/bookings/batch", response_model=List[BookingBatchResult])
+async def create_booking_batch(batch: BookingBatch, background_tasks: BackgroundTasks):
+    """Book several rooms at once, all or nothing.
+
+    Every requested room is checked in one query. Either all bookings are
+    inserted together, or none are and a 409 lists the reason for each room
+    that failed. Results are returned in request order.
+    """
+    if not batch.bookings:
+        raise HTTPException(status_code=400, detail="No bookings given")
+    if len(batch.bookings) > MAX_BATCH_BOOKINGS:
+        raise HTTPException(status_code=400, detail=f"A batch is limited to {MAX_BATCH_BOOKINGS} bookings")
+    params = {field: [getattr(booking, field) for booking in batch.bookings] for field in Booking.model_fields}
+
+    async with get_async_connection() as connection:
+        try:
+            async with connection.cursor(row_factory=dict_row) as cursor:
+                # Serialize batches that share rooms. The locks are taken in room order so two
+                # batches can't deadlock, and they're advisory so single bookings never wait on them.
+                await cursor.execute("""
+                    SELECT pg_advisory_xact_lock(hashtext('rooms'), room_id)
+                    FROM (SELECT DISTINCT unnest(%s::int[]) AS room_id ORDER BY 1) r
+                """, (params["room_id"],))
+
+                await cursor.execute("WITH " + BATCH_REQUESTED + """
+                    SELECT r.room_id, CASE
+                        WHEN r.check_out_date <= r.check_in_date THEN 'Check-out date must be after check-in date'
+                        WHEN r.status NOT IN ('confirmed', 'checked-in', 'checked-out', 'cancelled')
+                            THEN 'Status must be one of confirmed, checked-in, checked-out, cancelled'
+                        WHEN NOT EXISTS (SELECT 1 FROM guests g WHERE g.id = r.guest_id) THEN 'Guest not found'
+                        WHEN rm.id IS NULL THEN 'Room not found'
+                        WHEN rm.status = 'maintenance' THEN 'Room is under maintenance'
+                        WHEN r.status NOT IN ('confirmed', 'checked-in') THEN NULL
+                        WHEN EXISTS (
+                            SELECT 1 FROM bookings b
+                            WHERE b.room_id = r.room_id
+                            AND b.status IN ('confirmed', 'checked-in')
+                            AND b.stay && daterange(r.check_in_date, r.check_out_date, '[)')
+                        ) THEN 'Room is already booked for the selected dates'
+                        WHEN EXISTS (
+                            SELECT 1 FROM requested o
+                            WHERE o.room_id = r.room_id AND o.n <> r.n
+                            AND o.status IN ('confirmed', 'checked-in')
+                            AND o.check_out_date > o.check_in_date
+                            AND daterange(o.check_in_date, o.check_out_date, '[)')
+                                && daterange(r.check_in_date, r.check_out_date, '[)')
+                        ) THEN 'Room is requested more than once for the selected dates'
+                    END AS error
+                    FROM requested r
+                    LEFT JOIN rooms rm ON rm.id = r.room_id
+                    ORDER BY r.n
+                """, params)
+                results = await cursor.fetchall()
+                if any(result["error"] for result in results):
+                    await connection.rollback()
+                    raise HTTPException(status_code=409, detail=results)
+
+                # One multi-row INSERT. Ids are drawn per request row up front, so each
+                # inserted booking is matched back to its position n in the request.
+                await cursor.execute("WITH " + BATCH_REQUESTED + """,
+                    numbered AS MATERIALIZED (
+                        SELECT nextval(pg_get_serial_sequence('bookings', 'id'))::int AS id, *
+                        FROM requested
+                    ),
+                    inserted AS (
+                        INSERT INTO bookings (id, guest_id, room_id, check_in_date, check_out_date, total_amount, status)
+                        SELECT id, guest_id, room_id, check_in_date, check_out_date, total_amount, status
+                        FROM numbered
+                        ORDER BY n
+                        RETURNING *
+                    )
+                    SELECT inserted.* FROM inserted
+                    JOIN numbered USING (id)
+                    ORDER BY numbered.n
+                """, params)
+                created = await cursor.fetchall()
+
+                await connection.commit()
+                background_tasks.add_task(refresh_daily_stats,
+                                          (min(params["check_in_date"]), max(params["check_out_date"])))
+                background_tasks.add_task(sync_rooms, params["room_id"])
+                return [{"room_id": booking["room_id"], "booking": booking} for booking in created]
+        except HTTPException:
+            raise
+        except errors.ExclusionViolation:
+            await connection.rollback()
+            raise HTTPException(status_code=409, detail="A room was booked for the selected dates while the batch was being placed")
+        except Exception as e:
+            await connection.rollback()
+            raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/bookings/bulk", response_model=BulkImportResult)
+async def bulk_import_bookings(request: Request, background_tasks: BackgroundTasks,
+                               import_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$")):
+    """Create bookings from a CSV or NDJSON upload.
+
+    Meant for loading a property's booking history: only active stays are
+    refused for rooms under maintenance, and overlapping active stays are
+    rejected, against existing bookings and within the upload. Room status
+    is synced with the imported stays once the import has committed.
+    """
+    rows, parse_errors = await parse_upload(request, import_format, Booking)
+    async with get_async_connection() as connection:
+        try:
+            async with connection.cursor(row_factory=dict_row) as cursor:
+                db_errors = await stage_rows(cursor, """
+                    CREATE TEMP TABLE booking_import (
+                        line INTEGER, guest_id INTEGER, room_id INTEGER, check_in_date DATE,
+                        check_out_date DATE, total_amount INTEGER, status VARCHAR(20), error TEXT
+                    ) ON COMMIT DROP
+                """, "booking_import",
+                    ["guest_id", "room_id", "check_in_date", "check_out_date", "total_amount", "status"],
+                    rows, ["""
+                    UPDATE booking_import s SET error = CASE
+                        WHEN s.check_out_date <= s.check_in_date THEN 'Check-out date must be after check-in date'
+                        WHEN NOT EXISTS (SELECT 1 FROM guests g WHERE g.id = s.guest_id) THEN 'Guest not found'
+                        WHEN NOT EXISTS (SELECT 1 FROM rooms r WHERE r.id = s.room_id) THEN 'Room not found'
+                        WHEN s.status IN ('confirmed', 'checked-in') AND EXISTS (
+                            SELECT 1 FROM rooms r WHERE r.id = s.room_id AND r.status = 'maintenance'
+                        ) THEN 'Room is under maintenance'
+                        WHEN s.status IN ('confirmed', 'checked-in') AND EXISTS (
+                            SELECT 1 FROM bookings b
+                            WHERE b.room_id = s.room_id
+                            AND b.status IN ('confirmed', 'checked-in')
+                            AND b.stay && daterange(s.check_in_date, s.check_out_date, '[)')
+                        ) THEN 'Room is already booked for the selected dates'
+                    END
+                """, """
+                    -- Reject any remaining active stay that starts before an earlier
+                    -- stay for the same room in the upload has ended
+                    UPDATE booking_import s SET error = 'Overlaps another booking for this room in the upload'
+                    FROM (
+                        SELECT line, check_in_date < MAX(check_out_date) OVER (
+                            PARTITION BY room_id ORDER BY check_in_date, line
+                            ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+                        ) AS overlaps
+                        FROM booking_import
+                        WHERE error IS NULL AND status IN ('confirmed', 'checked-in')
+                    ) c
+                    WHERE c.line = s.line AND c.overlaps
+                """, """
+                    INSERT INTO bookings (guest_id, room_id, check_in_date, check_out_date, total_amount, status)
+                    SELECT guest_id, room_id, check_in_date, check_out_date, total_amount, status
+                    FROM booking_import
+                    WHERE error IS NULL ORDER BY line
+                """])
+                await cursor.execute("""
+                    SELECT MIN(check_in_date) AS first_day, MAX(check_out_date) AS last_day,
+                           ARRAY_AGG(DISTINCT room_id) AS room_ids
+                    FROM booking_import WHERE error IS NULL
+                """)
+                imported = await cursor.fetchone()
+                await connection.commit()
+                if imported["first_day"]:
+                    background_tasks.add_task(refresh_daily_stats, (imported["first_day"], imported["last_day"]))
+                    background_tasks.add_task(sync_rooms, imported["room_ids"])
+                return import_result(rows, parse_errors, db_errors)
+        except errors.ExclusionViolation:
+            await connection.rollback()
+            raise HTTPException(status_code=409, detail="A booking made during the import overlaps the upload, please retry")
+        except Exception as e:
+            await connection.rollback()
+            raise HTTPException(status_code=500, detail=str(e))
 
 @app.put("/bookings/{booking_id}", response_model=BookingResponse)
-def update_booking(booking_id: int, booking: Booking):
-    """Update a booking and adjust room status accordingly"""
-    connection = get_db_connection()
-    if not connection:
-        raise HTTPException(status_code=500, detail="Database connection failed")
-    
-    try:
-        cursor = connection.cursor(cursor_factory=RealDictCursor)
-        
-        # Get old booking details
-        cursor.execute("SELECT * FROM bookings WHERE id = %s", (booking_id,))
-        old_booking = cursor.fetchone()
-        if not old_booking:
-            raise HTTPException(status_code=404, detail="Booking not found")
-        
-        # Check for date conflicts if room or dates changed
-        if (booking.room_id != old_booking['room_id'] or 
-            str(booking.check_in_date) != str(old_booking['check_in_date']) or 
-            str(booking.check_out_date) != str(old_booking['check_out_date'])):
-            
-            conflict_query = """
-                SELECT COUNT(*) as count FROM bookings
-                WHERE room_id = %s 
-                AND id != %s
-                AND status IN ('confirmed', 'checked-in')
-                AND NOT (check_out_date <= %s OR check_in_date >= %s)
-            """
-            cursor.execute(conflict_query, (booking.room_id, booking_id, booking.check_in_date, booking.check_out_date))
-            conflict = cursor.fetchone()
-            if conflict and conflict['count'] > 0:
-                raise HTTPException(status_code=400, detail="Room is already booked for the selected dates")
-        
-        # Update booking
-        query = """
-            UPDATE bookings 
-            SET guest_id = %s, room_id = %s, check_in_date = %s, 
-                check_out_date = %s, total_amount = %s, status = %s
-            WHERE id = %s
-        """
-        cursor.execute(query, (booking.guest_id, booking.room_id, booking.check_in_date,
-                              booking.check_out_date, booking.total_amount, booking.status, booking_id))
-        
-        # Handle room status changes based on booking status
-        if booking.status == 'checked-in':
-            # Mark new room as occupied
-            cursor.execute("UPDATE rooms SET status = 'occupied' WHERE id = %s", (booking.room_id,))
-            # If room changed, free up old room
-            if booking.room_id != old_booking['room_id']:
-                cursor.execute("UPDATE rooms SET status = 'available' WHERE id = %s", (old_booking['room_id'],))
-        
-        elif booking.status == 'checked-out':
-            # Free up the room
-            cursor.execute("UPDATE rooms SET status = 'available' WHERE id = %s", (booking.room_id,))
-        
-        elif booking.status == 'cancelled':
-            # Free up the room
-            cursor.execute("UPDATE rooms SET status = 'available' WHERE id = %s", (booking.room_id,))
-        
-        elif booking.status == 'confirmed':
-            # If changing from checked-in to confirmed, free the room
-            if old_booking['status'] == 'checked-in':
-                cursor.execute("UPDATE rooms SET status = 'available' WHERE id = %s", (old_booking['room_id'],))
-        
-        connection.commit()
-        
-        cursor.execute("SELECT * FROM bookings WHERE id = %s", (booking_id,))
-        updated_booking = cursor.fetchone()
-        return updated_booking
-    except HTTPException:
-        raise
-    except Exception as e:
-        connection.rollback()
-        raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        cursor.close()
-        close_db_connection(connection)
+async def update_booking(booking_id: int, booking: Booking, background_tasks: BackgroundTasks):
+    """Update a booking; its old and new rooms' status is synced afterwards"""
+    # Checked up front: the generated stay range fails before bookings_valid_dates would
+    if booking.check_out_date <= booking.check_in_date:
+        raise HTTPException(status_code=400, detail="Check-out date must be after check-in date")
+    check_booking_status(booking.status)
+    async with get_async_connection() as connection:
+        try:
+            async with connection.cursor(row_factory=dict_row) as cursor:
+                # Date conflicts are rejected by the bookings_no_overlap constraint
+                query = """
+                    WITH old_booking AS (
+                        SELECT id, room_id, status, check_in_date, check_out_date
+                        FROM bookings WHERE id = %(id)s
+                        FOR UPDATE
+                    ), updated AS (
+                        UPDATE bookings b
+                        SET guest_id = %(guest_id)s, room_id = %(room_id)s, check_in_date = %(check_in_date)s,
+                            check_out_date = %(check_out_date)s, total_amount = %(total_amount)s, status = %(status)s
+                        FROM old_booking
+                        WHERE b.id = old_booking.id
+                        RETURNING b.*
+                    )
+                    SELECT updated.*, old_booking.room_id AS old_room_id,
+                           old_booking.check_in_date AS old_check_in_date,
+                           old_booking.check_out_date AS old_check_out_date
+                    FROM updated JOIN old_booking ON true
+                """
+                await cursor.execute(query, dict(booking.model_dump(), id=booking_id))
+                updated_booking = await cursor.fetchone()
+                if not updated_booking:
+                    raise HTTPException(status_code=404, detail="Booking not found")
+
+                await connection.commit()
+                background_tasks.add_task(refresh_daily_stats,
+                                          (updated_booking.pop('old_check_in_date'),
+                                           updated_booking.pop('old_check_out_date')),
+                                          (booking.check_in_date, booking.check_out_date))
+                background_tasks.add_task(sync_rooms, [updated_booking.pop('old_room_id'), booking.room_id])
+                return updated_booking
+        except HTTPException:
+            raise
+        except errors.ExclusionViolation:
+            await connection.rollback()
+            raise HTTPException(status_code=409, detail="Room is already booked for the selected dates")
+        except errors.CheckViolation:
+            await connection.rollback()
+            raise HTTPException(status_code=400, detail="Check-out date must be after check-in date")
+        except Exception as e:
+            await connection.rollback()
+            raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/bookings/{booking_id}")
-def cancel_booking(booking_id: int):
-    """Cancel a booking and free up the room"""
-    connection = get_db_connection()
-    if not connection:
-        raise HTTPException(status_code=500, detail="Database connection failed")
-    
-    try:
-        cursor = connection.cursor(cursor_factory=RealDictCursor)
-        
-        # Get booking details
-        cursor.execute("SELECT room_id FROM bookings WHERE id = %s", (booking_id,))
-        booking = cursor.fetchone()
-        if not booking:
-            raise HTTPException(status_code=404, detail="Booking not found")
-        
-        # Update booking status
-        cursor.execute("UPDATE bookings SET status = 'cancelled' WHERE id = %s", (booking_id,))
-        
-        # Update room status
-        cursor.execute("UPDATE rooms SET status = 'available' WHERE id = %s", (booking['room_id'],))
-        
-        connection.commit()
-        return {"message": "Booking cancelled successfully"}
-    except HTTPException:
-        raise
-    except Exception as e:
-        connection.rollback()
-        raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        cursor.close()
-        close_db_connection(connection)
+async def cancel_booking(booking_id: int, background_tasks: BackgroundTasks):
+    """Cancel a booking; its room is freed afterwards unless another stay holds it"""
+    async with get_async_connection() as connection:
+        try:
+            async with connection.cursor(row_factory=dict_row) as cursor:
+                await cursor.execute("""
+                    UPDATE bookings SET status = 'cancelled' WHERE id = %s
+                    RETURNING room_id, check_in_date, check_out_date
+                """, (booking_id,))
+                booking = await cursor.fetchone()
+                if not booking:
+                    raise HTTPException(status_code=404, detail="Booking not found")
+
+                await connection.commit()
+                background_tasks.add_task(refresh_daily_stats, (booking['check_in_date'], booking['check_out_date']))
+                background_tasks.add_task(sync_rooms, [booking['room_id']])
+                return {"message": "Booking cancelled successfully"}
+        except HTTPException:
+            raise
+        except Exception as e:
+            await connection.rollback()
+            raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/available-rooms", response_model=List[RoomResponse])
-def get_available_rooms(check_in: str = None, check_out: str = None):
-    """Get available rooms, optionally filtered by date range"""
-    connection = get_db_connection()
-    if not connection:
-        raise HTTPException(status_code=500, detail="Database connection failed")
-    
-    try:
-        cursor = connection.cursor(cursor_factory=RealDictCursor)
-        
-        if check_in and check_out:
-            # Get rooms that are either available or don't have conflicting bookings
-            query = """
-                SELECT r.* FROM rooms r
-                WHERE r.id NOT IN (
-                    SELECT b.room_id FROM bookings b
-                    WHERE b.status IN ('confirmed', 'checked-in')
-                    AND NOT (
-                        b.check_out_date <= %s OR b.check_in_date >= %s
-                    )
-                )
-            """
-            cursor.execute(query, (check_in, check_out))
-        else:
-            # Just get rooms marked as available
-            cursor.execute("SELECT * FROM rooms WHERE status = 'available'")
-        
-        rooms = cursor.fetchall()
-        return rooms
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        cursor.close()
-        close_db_connection(connection)
+async def get_available_rooms(request: Request,
+                              check_in: Optional[date] = None, check_out: Optional[date] = None,
+                              room_type: Optional[str] = None, min_price: Optional[int] = None,
+                              max_price: Optional[int] = None):
+    """Get available rooms, optionally filtered by date range, room type and price band"""
+    if check_in and check_out and check_out <= check_in:
+        raise HTTPException(status_code=400, detail="Check-out date must be after check-in date")
+
+    # Only the status-based listing is cached; date searches always hit the database
+    cache_key = None
+    if not (check_in and check_out):
+        cache_key = ("available-rooms", room_type, min_price, max_price)
+        cached = room_cache.get(cache_key)
+        if cached is not MISSING:
+            versions, body = cached
+            headers = check_not_modified(request, None, make_etag(request, versions))
+            return json_response(headers=headers, body=body)
+
+    generation = room_cache.generation
+    async with get_async_connection() as connection:
+        try:
+            async with connection.cursor(row_factory=dict_row) as cursor:
+                if cache_key:
+                    versions = await fetch_versions(cursor, "rooms")
+                else:
+                    versions = await fetch_versions(cursor, "rooms", "bookings")
+                headers = check_not_modified(request, None, make_etag(request, versions))
+
+                params = {"check_in": check_in, "check_out": check_out, "room_type": room_type,
+                          "min_price": min_price, "max_price": max_price}
+
+                if check_in and check_out:
+                    # Probe each room in the bookings_no_overlap GiST index (room_id, stay);
+                    # its partial predicate matches the active statuses below
+                    conditions = ["r.status <> 'maintenance'", """NOT EXISTS (
+                        SELECT 1 FROM bookings b
+                        WHERE b.room_id = r.id
+                        AND b.status IN ('confirmed', 'checked-in')
+                        AND b.stay && daterange(%(check_in)s, %(check_out)s, '[)')
+                    )"""]
+                else:
+                    # Just get rooms marked as available
+                    conditions = ["r.status = 'available'"]
+
+                if room_type:
+                    conditions.append("r.room_type = %(room_type)s")
+                if min_price is not None:
+                    conditions.append("r.price >= %(min_price)s")
+                if max_price is not None:
+                    conditions.append("r.price <= %(max_price)s")
+
+                await cursor.execute(f"SELECT {ROOM_COLUMNS_R} FROM rooms r WHERE " + " AND ".join(conditions),
+                                     params)
+                body = dumps(await cursor.fetchall())
+                if cache_key:
+                    room_cache.set(cache_key, (versions, body), generation)
+                return json_response(headers=headers, body=body)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/availability/calendar", response_model=AvailabilityCalendar)
+async def get_availability_calendar(request: Request,
+                                    date_from: date = Query(alias="from"), date_to: date = Query(alias="to"),
+                                    room_type: Optional[str] = None):
+    """Room x day occupancy grid for the nights from..to (both included).
+
+    rooms lists the rooms column by column in room number order. grid has one
+    string per room with a character per night: 0 free, 1 booked, 2 checked in.
+    """
+    if date_to < date_from:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    days = (date_to - date_from).days + 1
+    if days > MAX_CALENDAR_DAYS:
+        raise HTTPException(status_code=400, detail=f"Date range is limited to {MAX_CALENDAR_DAYS} days")
+
+    async with get_async_connection() as connection:
+        try:
+            async with connection.cursor(row_factory=dict_row) as cursor:
+                headers = await check_etag(request, None, cursor, "rooms", "bookings")
+                # The grid is built from plain tuples
+                cursor.row_factory = tuple_row
+                params = {"date_from": date_from, "date_to": date_to, "days": days, "room_type": room_type}
+                room_filter = " WHERE room_type = %(room_type)s" if room_type else ""
+                await cursor.execute("SELECT id, room_number, room_type, price FROM rooms"
+                                     + room_filter + " ORDER BY room_number", params)
+                rooms = await cursor.fetchall()
+                stays_query = CALENDAR_STAYS_QUERY
+                if room_type:
+                    stays_query += " AND b.room_id IN (SELECT id FROM rooms WHERE room_type = %(room_type)s)"
+                await cursor.execute(stays_query, params)
+                stays = await cursor.fetchall()
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    ids, numbers, types, prices = zip(*rooms) if rooms else ((), (), (), ())
+    grid = paint_calendar(ids, stays, days)
+    return json_response({
+        "start": date_from,
+        "days": days,
+        "rooms": {"id": ids, "room_number": numbers, "room_type": types, "price": prices},
+        "grid": encode_grid(grid),
+    }, headers)
+
+# ==================== STATS ENDPOINTS ====================
+
+@app.get("/stats/dashboard", response_model=DashboardStats)
+async def get_dashboard_stats(request: Request, response: Response):
+    """Get the dashboard metrics and chart data in a single query"""
+    async with get_async_connection() as connection:
+        try:
+            async with connection.cursor(row_factory=dict_row) as cursor:
+                await check_etag(request, response, cursor, "rooms", "guests", "bookings")
+                query = """
+                    SELECT
+                        (SELECT COUNT(*) FROM rooms) AS total_rooms,
+                        (SELECT COUNT(*) FROM rooms WHERE status = 'available') AS available_rooms,
+                        (SELECT COUNT(*) FROM guests) AS total_guests,
+                        (SELECT COUNT(*) FROM bookings
+                         WHERE status IN ('confirmed', 'checked-in')) AS active_bookings,
+                        (SELECT COALESCE(json_object_agg(status, count), '{}')
+                         FROM (SELECT status, COUNT(*) AS count FROM rooms GROUP BY status) s
+                        ) AS room_status_counts,
+                        (SELECT COALESCE(json_object_agg(room_type, revenue), '{}')
+                         FROM (SELECT r.room_type, SUM(b.total_amount) AS revenue
+                               FROM bookings b JOIN rooms r ON b.room_id = r.id
+                               GROUP BY r.room_type) t
+                        ) AS revenue_by_room_type
+                """
+                await cursor.execute(query)
+                stats = await cursor.fetchone()
+                return stats
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/stats/cache")
+async def get_cache_stats():
+    """Get hit/miss counters for the room catalog cache"""
+    return room_cache.stats()
+
+@app.get("/stats/room-status")
+async def get_room_status_stats():
+    """Get run counters and the last run of the room status sync"""
+    return sync_stats.stats()
+
+OCCUPANCY_QUERY = """
+    WITH inventory AS (
+        SELECT room_type, COUNT(*) AS rooms FROM rooms GROUP BY room_type
+    ), daily AS (
+        SELECT night::date AS day, i.room_type, i.rooms,
+               COALESCE(s.room_nights, 0) AS room_nights,
+               COALESCE(s.revenue, 0) AS revenue
+        FROM generate_series(%(date_from)s::date, %(date_to)s::date, interval '1 day') AS night
+        CROSS JOIN inventory i
+        LEFT JOIN daily_room_type_stats s ON s.day = night::date AND s.room_type = i.room_type
+        WHERE %(room_type)s::text IS NULL OR i.room_type = %(room_type)s
+    )
+"""
+
+def check_stats_range(date_from, date_to):
+    """Validate a from/to window for the occupancy endpoints"""
+    check_date_order(date_from, date_to)
+    if (date_to - date_from).days >= MAX_STATS_DAYS:
+        raise HTTPException(status_code=400, detail=f"Date range is limited to {MAX_STATS_DAYS} days")
+
+@app.get("/stats/occupancy", response_model=List[OccupancyDay])
+async def get_occupancy(request: Request,
+                        date_from: date = Query(alias="from"), date_to: date = Query(alias="to"),
+                        room_type: Optional[str] = None):
+    """Get daily occupancy %, ADR and RevPAR per room type from the daily rollup"""
+    check_stats_range(date_from, date_to)
+    async with get_async_connection() as connection:
+        try:
+            async with connection.cursor(row_factory=dict_row) as cursor:
+                headers = await check_etag(request, None, cursor, "rooms", "daily_room_type_stats")
+                query = OCCUPANCY_QUERY + """
+                    SELECT day, room_type, rooms, room_nights, revenue,
+                           ROUND(100.0 * room_nights / rooms, 2) AS occupancy_pct,
+                           ROUND(revenue / NULLIF(room_nights, 0), 2) AS adr,
+                           ROUND(revenue / rooms, 2) AS revpar
+                    FROM daily
+                    ORDER BY day, room_type
+                """
+                await cursor.execute(query, {"date_from": date_from, "date_to": date_to, "room_type": room_type})
+                return json_response(await cursor.fetchall(), headers)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/stats/occupancy/summary", response_model=List[OccupancySummary])
+async def get_occupancy_summary(request: Request,
+                                date_from: date = Query(alias="from"), date_to: date = Query(alias="to"),
+                                room_type: Optional[str] = None):
+    """Get occupancy %, ADR and RevPAR per room type over the whole from/to window"""
+    check_stats_range(date_from, date_to)
+    async with get_async_connection() as connection:
+        try:
+            async with connection.cursor(row_factory=dict_row) as cursor:
+                headers = await check_etag(request, None, cursor, "rooms", "daily_room_type_stats")
+                query = OCCUPANCY_QUERY + """
+                    SELECT room_type, MAX(rooms) AS rooms, COUNT(*) AS days,
+                           SUM(room_nights) AS room_nights, SUM(revenue) AS revenue,
+                           ROUND(100.0 * SUM(room_nights) / SUM(rooms), 2) AS occupancy_pct,
+                           ROUND(SUM(revenue) / NULLIF(SUM(room_nights), 0), 2) AS adr,
+                           ROUND(SUM(revenue) / SUM(rooms), 2) AS revpar
+                    FROM daily
+                    GROUP BY room_type
+                    ORDER BY room_type
+                """
+                await cursor.execute(query, {"date_from": date_from, "date_to": date_to, "room_type": room_type})
+                return json_response(await cursor.fetchall(), headers)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
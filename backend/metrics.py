@@ -0,0 +1,119 @@
+import logging
+import os
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+# Set METRICS_ENABLED=0 to skip recording (X-DB-Statements is still reported)
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1').lower() not in ('0', 'false', 'no')
+# Statements slower than this many milliseconds are logged to the slow_queries logger (0 = off)
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 200))
+
+slow_query_log = logging.getLogger('slow_queries')
+
+REQUEST_SECONDS = Histogram(
+    'http_request_duration_seconds', 'Time spent handling HTTP requests',
+    ['method', 'route', 'status'],
+)
+STATEMENT_SECONDS = Histogram(
+    'db_statement_duration_seconds', 'Time spent executing SQL statements',
+    ['route', 'operation'],
+    buckets=(.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10),
+)
+STATEMENT_ROWS = Counter(
+    'db_statement_rows', 'Rows returned or affected by SQL statements',
+    ['route', 'operation'],
+)
+CHECKOUT_SECONDS = Histogram(
+    'db_pool_checkout_seconds', 'Time spent waiting for a pooled connection',
+    buckets=(.0001, .0005, .001, .005, .01, .05, .1, .5, 1, 2.5, 5),
+)
+
+
+def route_label(scope):
+    """Route template a request matched, so /rooms/1 and /rooms/2 share a series"""
+    if scope is None:
+        return 'none'
+    route = scope.get('route')
+    return route.path if route is not None else 'unmatched'
+
+
+def operation_label(query):
+    """First keyword of a statement (SELECT, INSERT, WITH, ...)"""
+    if isinstance(query, bytes):
+        query = query.decode(errors='replace')
+    if not isinstance(query, str):
+        return 'COMPOSED'
+    words = query.split(None, 1)
+    return words[0].upper() if words else 'EMPTY'
+
+
+def observe_request(scope, status, seconds):
+    if METRICS_ENABLED:
+        REQUEST_SECONDS.labels(scope['method'], route_label(scope), status).observe(seconds)
+
+
+def observe_statement(scope, query, seconds, rows):
+    """Record one statement's timing and row count, logging it if it was slow"""
+    if METRICS_ENABLED:
+        route = route_label(scope)
+        operation = operation_label(query)
+        STATEMENT_SECONDS.labels(route, operation).observe(seconds)
+        if rows > 0:
+            STATEMENT_ROWS.labels(route, operation).inc(rows)
+    if SLOW_QUERY_MS and seconds * 1000 >= SLOW_QUERY_MS:
+        # Parameters are left out of the log because they carry guest details
+        slow_query_log.warning("%.1f ms %s %s: %s", seconds * 1000,
+                               scope['method'] if scope else '-', route_label(scope),
+                               ' '.join(str(query).split())[:500])
+
+
+def observe_checkout(seconds):
+    if METRICS_ENABLED:
+        CHECKOUT_SECONDS.observe(seconds)
+
+
+class PoolCollector:
+    """Exports psycopg_pool's own statistics at scrape time"""
+
+    GAUGES = {
+        'pool_min': ('db_pool_min_size', 'Configured minimum pool size'),
+        'pool_max': ('db_pool_max_size', 'Configured maximum pool size'),
+        'pool_size': ('db_pool_size', 'Connections currently managed by the pool'),
+        'pool_available': ('db_pool_available', 'Idle connections ready to hand out'),
+        'requests_waiting': ('db_pool_requests_waiting', 'Requests queued for a connection'),
+    }
+    COUNTERS = {
+        'requests_num': 'Connections requested from the pool',
+        'requests_queued': 'Requests that had to wait for a connection',
+        'requests_errors': 'Requests that timed out or were rejected',
+        'connections_num': 'Physical connections opened',
+        'connections_errors': 'Failed connection attempts',
+        'connections_lost': 'Connections found broken on checkout',
+    }
+    TIMERS = {
+        'requests_wait_ms': ('db_pool_requests_wait_seconds', 'Total time requests waited for a connection'),
+        'connections_ms': ('db_pool_connect_seconds', 'Total time spent opening physical connections'),
+        'usage_ms': ('db_pool_usage_seconds', 'Total time connections were checked out'),
+    }
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    def collect(self):
+        stats = self.pool.get_stats()
+        for key, (name, help_text) in self.GAUGES.items():
+            yield GaugeMetricFamily(name, help_text, value=stats.get(key, 0))
+        for key, help_text in self.COUNTERS.items():
+            yield CounterMetricFamily(f'db_pool_{key}', help_text, value=stats.get(key, 0))
+        for key, (name, help_text) in self.TIMERS.items():
+            yield CounterMetricFamily(name, help_text, value=stats.get(key, 0) / 1000)
+
+
+def register_pool(pool):
+    """Expose a connection pool's statistics on /metrics"""
+    REGISTRY.register(PoolCollector(pool))
+
+
+def render_metrics():
+    """Current metrics in the Prometheus text format, with their content type"""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
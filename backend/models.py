@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import date, datetime
-from typing import Optional
+from typing import Dict, List, Optional
 
 class Room(BaseModel):
     room_number: str
@@ -34,8 +34,18 @@ class BookingResponse(Booking):
     id: int
     created_at: datetime
 
+class BookingBatch(BaseModel):
+    bookings: List[Booking]
+
+class BookingBatchResult(BaseModel):
+    room_id: int
+    error: Optional[str] = None
+    booking: Optional[BookingResponse] = None
+
 class BookingDetail(BaseModel):
     booking_id: int
+    guest_id: int
+    room_id: int
     guest_name: str
     room_number: str
     room_type: str
@@ -44,3 +54,60 @@ class BookingDetail(BaseModel):
     total_amount: int
     status: str
     created_at: datetime
+
+class GuestPage(BaseModel):
+    items: List[GuestResponse]
+    next_cursor: Optional[str] = None
+
+class BookingPage(BaseModel):
+    items: List[BookingDetail]
+    next_cursor: Optional[str] = None
+
+class DashboardStats(BaseModel):
+    total_rooms: int
+    available_rooms: int
+    total_guests: int
+    active_bookings: int
+    room_status_counts: Dict[str, int]
+    revenue_by_room_type: Dict[str, int]
+
+class OccupancyDay(BaseModel):
+    day: date
+    room_type: str
+    rooms: int
+    room_nights: int
+    revenue: float
+    occupancy_pct: float
+    adr: Optional[float] = None
+    revpar: float
+
+class OccupancySummary(BaseModel):
+    room_type: str
+    rooms: int
+    days: int
+    room_nights: int
+    revenue: float
+    occupancy_pct: float
+    adr: Optional[float] = None
+    revpar: float
+
+class CalendarRooms(BaseModel):
+    id: List[int]
+    room_number: List[str]
+    room_type: List[str]
+    price: List[int]
+
+class AvailabilityCalendar(BaseModel):
+    start: date
+    days: int
+    rooms: CalendarRooms
+    grid: List[str]
+
+class BulkImportError(BaseModel):
+    line: int
+    error: str
+
+class BulkImportResult(BaseModel):
+    received: int
+    inserted: int
+    errors: List[BulkImportError]
@@ -0,0 +1,29 @@
+import base64
+from datetime import datetime
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(created_at, row_id):
+    """Encode the (created_at, id) keyset position of a row as an opaque token"""
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Decode a cursor token back to (created_at, id); raises ValueError if malformed"""
+    try:
+        created_at, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(row_id)
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
+
+def build_page(rows, limit, id_key="id"):
+    """Turn up to limit + 1 fetched rows into a page with the cursor for the next one"""
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor(items[-1]["created_at"], items[-1][id_key])
+    return {"items": items, "next_cursor": next_cursor}
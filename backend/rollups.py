@@ -0,0 +1,17 @@
+from async_database import get_async_connection
+
+
+async def refresh_daily_stats(*ranges):
+    """Recompute daily_room_type_stats for the given (check_in_date, check_out_date) ranges.
+
+    Runs after the booking change has committed (as a FastAPI background
+    task), so the write path never waits on the rollup lock.
+    """
+    try:
+        async with get_async_connection() as connection:
+            for from_day, to_day in ranges:
+                await connection.execute(
+                    "SELECT refresh_daily_room_type_stats(%s, %s)", (from_day, to_day)
+                )
+    except Exception as e:
+        print(f"Error refreshing daily stats for {ranges}: {type(e).__name__}: {e}")
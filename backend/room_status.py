@@ -0,0 +1,181 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from async_database import get_async_connection
+from cache import room_cache
+
+# Seconds between full room status syncs (0 = no background worker)
+ROOM_STATUS_SYNC_INTERVAL = float(os.getenv('ROOM_STATUS_SYNC_INTERVAL', 300))
+# Rooms locked and updated per transaction
+ROOM_STATUS_BATCH_SIZE = int(os.getenv('ROOM_STATUS_BATCH_SIZE', 500))
+
+# Session advisory lock held by the one replica running a full sync
+SYNC_LOCK = 'room_status_sync'
+
+# Status a room should have today: occupied while a guest is checked in (until
+# they check out, even past the check-out date) or a confirmed stay covers
+# today, available otherwise. Rooms under maintenance are left alone.
+EXPECTED_STATUS = """
+    CASE WHEN EXISTS (
+        SELECT 1 FROM bookings b
+        WHERE b.room_id = r.id
+        AND b.status IN ('confirmed', 'checked-in')
+        AND (b.status = 'checked-in' OR b.stay @> CURRENT_DATE)
+    ) THEN 'occupied' ELSE 'available' END
+"""
+
+# The next batch of rooms whose status is out of date, locked in id order so
+# a concurrent booking write either commits before the update below or waits
+STALE_ROOMS_QUERY = f"""
+    SELECT r.id FROM rooms r
+    WHERE r.id > %(after)s
+    AND (%(room_ids)s::int[] IS NULL OR r.id = ANY(%(room_ids)s::int[]))
+    AND r.status IN ('available', 'occupied')
+    AND r.status <> {EXPECTED_STATUS}
+    ORDER BY r.id
+    LIMIT %(limit)s
+    FOR UPDATE OF r
+"""
+
+# One set-based update per batch. It runs as a new statement after the rows
+# are locked, so it sees every booking committed by writers it waited for.
+SYNC_ROOMS_QUERY = f"""
+    UPDATE rooms r SET status = {EXPECTED_STATUS}
+    WHERE r.id = ANY(%(room_ids)s::int[])
+    AND r.status IN ('available', 'occupied')
+    AND r.status <> {EXPECTED_STATUS}
+    RETURNING r.status
+"""
+
+
+class SyncStats:
+    """Counters for the /stats/room-status endpoint"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.runs = 0
+        self.skipped = 0
+        self.failures = 0
+        self.room_syncs = 0
+        self.occupied = 0
+        self.freed = 0
+        self.last_run = None
+
+    def stats(self):
+        return {
+            "interval": self.interval,
+            "runs": self.runs,
+            "skipped": self.skipped,
+            "failures": self.failures,
+            "room_syncs": self.room_syncs,
+            "rooms_occupied": self.occupied,
+            "rooms_freed": self.freed,
+            "last_run": self.last_run,
+        }
+
+
+sync_stats = SyncStats(ROOM_STATUS_SYNC_INTERVAL)
+
+
+async def sync_batches(connection, room_ids=None):
+    """Update stale room statuses batch by batch, committing each one.
+
+    room_ids limits the sync to those rooms. Returns the number of rooms
+    marked occupied and the number freed.
+    """
+    occupied = freed = 0
+    after = 0
+    async with connection.cursor() as cursor:
+        while True:
+            await cursor.execute(STALE_ROOMS_QUERY, {"after": after, "room_ids": room_ids,
+                                                     "limit": ROOM_STATUS_BATCH_SIZE})
+            batch = [row[0] for row in await cursor.fetchall()]
+            if batch:
+                await cursor.execute(SYNC_ROOMS_QUERY, {"room_ids": batch})
+                for (status,) in await cursor.fetchall():
+                    if status == 'occupied':
+                        occupied += 1
+                    else:
+                        freed += 1
+            await connection.commit()
+            if len(batch) < ROOM_STATUS_BATCH_SIZE:
+                return occupied, freed
+            after = batch[-1]
+
+
+def record_changes(occupied, freed):
+    sync_stats.occupied += occupied
+    sync_stats.freed += freed
+    if occupied or freed:
+        room_cache.clear()
+
+
+async def sync_rooms(room_ids):
+    """Bring the given rooms' status in line with their bookings.
+
+    Runs after a booking change has committed (as a FastAPI background
+    task), so booking writes never lock room rows themselves.
+    """
+    try:
+        async with get_async_connection() as connection:
+            changes = await sync_batches(connection, sorted(set(room_ids)))
+        sync_stats.room_syncs += 1
+        record_changes(*changes)
+    except Exception as e:
+        print(f"Error syncing status of rooms {room_ids}: {type(e).__name__}: {e}")
+
+
+async def sync_all_rooms():
+    """Sync every room's status, unless another replica is already doing it"""
+    started = time.perf_counter()
+    run = {"started_at": datetime.now(timezone.utc).isoformat()}
+    try:
+        async with get_async_connection() as connection:
+            cursor = await connection.execute("SELECT pg_try_advisory_lock(hashtext(%s))", (SYNC_LOCK,))
+            (locked,) = await cursor.fetchone()
+            await connection.commit()
+            if not locked:
+                sync_stats.skipped += 1
+                run["result"] = "skipped"
+                return
+            try:
+                occupied, freed = await sync_batches(connection)
+            finally:
+                await connection.rollback()
+                await connection.execute("SELECT pg_advisory_unlock(hashtext(%s))", (SYNC_LOCK,))
+                await connection.commit()
+        sync_stats.runs += 1
+        record_changes(occupied, freed)
+        run.update(result="ok", occupied=occupied, freed=freed)
+    except Exception as e:
+        sync_stats.failures += 1
+        run.update(result="failed", error=f"{type(e).__name__}: {e}")
+        print(f"Error syncing room status: {type(e).__name__}: {e}")
+    finally:
+        run["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        sync_stats.last_run = run
+
+
+async def run_sync_worker(interval):
+    while True:
+        await sync_all_rooms()
+        await asyncio.sleep(interval)
+
+
+def start_sync_worker():
+    """Start the periodic full sync (called on application startup)"""
+    if ROOM_STATUS_SYNC_INTERVAL <= 0:
+        return None
+    return asyncio.create_task(run_sync_worker(ROOM_STATUS_SYNC_INTERVAL))
+
+
+async def stop_sync_worker(worker):
+    """Cancel the periodic sync (called on application shutdown)"""
+    if worker is None:
+        return
+    worker.cancel()
+    try:
+        await worker
+    except asyncio.CancelledError:
+        pass
@@ -0,0 +1,101 @@
+"""Compare the old sync psycopg2 handlers with the async routes at equal concurrency.
+
+``sync_app`` reproduces the previous request path: ``def`` handlers run on
+Starlette's threadpool, each checking a psycopg2 connection out of
+benchmarks/sync_database.py. The async path is the real ``main:app``. Both servers
+get the same request mix from the same number of concurrent clients.
+
+    python benchmarks/bench_async.py --concurrency 500 --duration 15
+"""
+import argparse
+import asyncio
+from datetime import date, timedelta
+
+import common  # noqa: F401  (puts backend/ on sys.path)
+from fastapi import FastAPI, HTTPException
+from psycopg2.extras import RealDictCursor
+from sync_database import get_db_connection, close_db_connection, PoolExhaustedError
+
+sync_app = FastAPI()
+
+
+def _query(sql, params=None, one=False):
+    connection = get_db_connection()
+    if not connection:
+        raise HTTPException(status_code=500, detail="Database connection failed")
+    try:
+        cursor = connection.cursor(cursor_factory=RealDictCursor)
+        cursor.execute(sql, params)
+        return cursor.fetchone() if one else cursor.fetchall()
+    finally:
+        cursor.close()
+        close_db_connection(connection)
+
+
+@sync_app.exception_handler(PoolExhaustedError)
+def pool_exhausted_handler(request, exc):
+    from fastapi.responses import JSONResponse
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
+
+
+@sync_app.get("/")
+def read_root():
+    return {"message": "sync baseline"}
+
+
+@sync_app.get("/rooms")
+def get_rooms():
+    return _query("SELECT * FROM rooms")
+
+
+@sync_app.get("/rooms/{room_id}")
+def get_room(room_id: int):
+    room = _query("SELECT * FROM rooms WHERE id = %s", (room_id,), one=True)
+    if not room:
+        raise HTTPException(status_code=404, detail="Room not found")
+    return room
+
+
+@sync_app.get("/available-rooms")
+def get_available_rooms(check_in: str = None, check_out: str = None):
+    return _query("""
+        SELECT r.* FROM rooms r
+        WHERE r.id NOT IN (
+            SELECT b.room_id FROM bookings b
+            WHERE b.status IN ('confirmed', 'checked-in')
+            AND NOT (b.check_out_date <= %s OR b.check_in_date >= %s)
+        )
+    """, (check_in, check_out))
+
+
+def request_mix():
+    check_in = date.today() + timedelta(days=7)
+    dates = {"check_in": check_in.isoformat(), "check_out": (check_in + timedelta(days=3)).isoformat()}
+    return [
+        ("GET", "/rooms", {}),
+        ("GET", "/rooms/1", {}),
+        ("GET", "/available-rooms", {"params": dates}),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+
+    results = {}
+    for name, app_path, port in (("sync_psycopg2", "bench_async:sync_app", args.port),
+                                 ("async_psycopg3", "main:app", args.port + 1)):
+        with common.serve(app_path, port) as base_url:
+            # Warm up the pool before measuring
+            asyncio.run(common.drive(base_url, request_mix(), 10, 1))
+            results[name] = asyncio.run(
+                common.drive(base_url, request_mix(), args.concurrency, args.duration)
+            )
+    common.report(results)
+
+
+if __name__ == "__main__":
+    main()
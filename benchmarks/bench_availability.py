@@ -0,0 +1,161 @@
+"""Time the /available-rooms query against a large, seeded booking history.
+
+Seeds ``--rooms`` benchmark rooms, each with a back-to-back history of
+non-overlapping stays (``--bookings`` in total, 1M by default), then runs
+random 1-7 night searches over the next 90 days with and without
+room_type / price filters. It compares the current NOT EXISTS query with
+the old NOT IN subquery and reports latency percentiles and the query plan.
+Benchmark rows are removed afterwards unless ``--keep`` is given.
+
+    python benchmarks/bench_availability.py --rooms 500 --bookings 1000000
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+import common
+from sync_database import get_db_connection, close_db_connection
+
+ROOM_PREFIX = "BA"
+ROOM_TYPES = ["Single", "Double", "Suite", "Deluxe"]
+PRICES = {"Single": 500, "Double": 800, "Suite": 1500, "Deluxe": 2000}
+
+CURRENT_QUERY = """
+    SELECT r.* FROM rooms r
+    WHERE NOT EXISTS (
+        SELECT 1 FROM bookings b
+        WHERE b.room_id = r.id
+        AND b.status IN ('confirmed', 'checked-in')
+        AND b.stay && daterange(%(check_in)s, %(check_out)s, '[)')
+    )
+"""
+
+OLD_QUERY = """
+    SELECT r.* FROM rooms r
+    WHERE r.id NOT IN (
+        SELECT b.room_id FROM bookings b
+        WHERE b.status IN ('confirmed', 'checked-in')
+        AND NOT (b.check_out_date <= %(check_in)s OR b.check_in_date >= %(check_out)s)
+    )
+"""
+
+FILTERS = " AND r.room_type = %(room_type)s AND r.price BETWEEN %(min_price)s AND %(max_price)s"
+
+
+def cleanup(cursor):
+    cursor.execute("DELETE FROM rooms WHERE room_number LIKE %s", (ROOM_PREFIX + "-%",))
+    cursor.execute("DELETE FROM guests WHERE email = 'bench.availability@example.com'")
+
+
+def seed(cursor, rooms, bookings, seed_value):
+    """Insert benchmark rooms and a non-overlapping stay history for each"""
+    per_room = max(1, bookings // rooms)
+    cursor.execute("""
+        INSERT INTO rooms (room_number, room_type, price, status)
+        SELECT %s || '-' || lpad(n::text, 6, '0'),
+               (%s::text[])[1 + n %% 4],
+               (%s::int[])[1 + n %% 4],
+               'available'
+        FROM generate_series(1, %s) AS n
+    """, (ROOM_PREFIX, ROOM_TYPES, [PRICES[t] for t in ROOM_TYPES], rooms))
+    cursor.execute("""
+        INSERT INTO guests (first_name, last_name, email, phone)
+        VALUES ('Bench', 'Availability', 'bench.availability@example.com', '000')
+        RETURNING id
+    """)
+    guest_id = cursor.fetchone()[0]
+
+    # Stays average 4 days including gaps; end the history ~120 days out so
+    # the searched window (next 90 days) is partly booked
+    first_day = date.today() - timedelta(days=per_room * 4 - 120)
+    cursor.execute("SELECT setseed(%s)", (seed_value,))
+    cursor.execute("""
+        INSERT INTO bookings (guest_id, room_id, check_in_date, check_out_date, total_amount, status)
+        SELECT %(guest_id)s, room_id,
+               %(first_day)s + start_offset,
+               %(first_day)s + start_offset + nights,
+               nights * price,
+               CASE WHEN cancelled THEN 'cancelled'
+                    WHEN %(first_day)s + start_offset + nights <= CURRENT_DATE THEN 'checked-out'
+                    ELSE 'confirmed' END
+        FROM (
+            SELECT room_id, price, nights, cancelled,
+                   (SUM(nights + gap) OVER (PARTITION BY room_id ORDER BY n) - nights - gap)::int AS start_offset
+            FROM (
+                SELECT r.id AS room_id, r.price, s.n,
+                       1 + floor(random() * 5)::int AS nights,
+                       floor(random() * 3)::int AS gap,
+                       random() < 0.08 AS cancelled
+                FROM rooms r CROSS JOIN generate_series(1, %(per_room)s) AS s(n)
+                WHERE r.room_number LIKE %(prefix)s
+            ) stays
+        ) placed
+    """, {"guest_id": guest_id, "first_day": first_day, "per_room": per_room,
+          "prefix": ROOM_PREFIX + "-%"})
+    cursor.execute("ANALYZE rooms")
+    cursor.execute("ANALYZE bookings")
+    return per_room * rooms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=500)
+    parser.add_argument("--bookings", type=int, default=1_000_000)
+    parser.add_argument("--searches", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-old", action="store_true", help="don't time the old NOT IN query")
+    parser.add_argument("--keep", action="store_true", help="leave the seeded rows in place")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    searches = []
+    for _ in range(args.searches):
+        check_in = date.today() + timedelta(days=rng.randrange(90))
+        room_type = rng.choice(ROOM_TYPES)
+        searches.append({
+            "check_in": check_in,
+            "check_out": check_in + timedelta(days=rng.randint(1, 7)),
+            "room_type": room_type,
+            "min_price": 0,
+            "max_price": PRICES[room_type],
+        })
+
+    connection = get_db_connection()
+    try:
+        cursor = connection.cursor()
+        cleanup(cursor)
+        seeded = seed(cursor, args.rooms, args.bookings, args.seed / 2 ** 31)
+        connection.commit()
+
+        variants = {"current": CURRENT_QUERY, "current_filtered": CURRENT_QUERY + FILTERS}
+        if not args.skip_old:
+            variants["old_not_in"] = OLD_QUERY
+        results = {"rooms": args.rooms, "bookings": seeded, "searches": args.searches}
+
+        for name, query in variants.items():
+            samples = []
+            returned = 0
+            for params in searches:
+                start = time.perf_counter()
+                cursor.execute(query, params)
+                returned += len(cursor.fetchall())
+                samples.append(time.perf_counter() - start)
+            results[name] = common.summarize(samples)
+            results[name]["avg_rooms_returned"] = round(returned / len(searches), 1)
+
+        cursor.execute("EXPLAIN " + CURRENT_QUERY + FILTERS, searches[0])
+        results["plan"] = [row[0] for row in cursor.fetchall()]
+        connection.rollback()
+
+        if not args.keep:
+            cleanup(cursor)
+            connection.commit()
+    finally:
+        close_db_connection(connection)
+
+    common.report(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Time one POST /bookings/batch for a group against one POST /bookings per room.
+
+Seeds ``--rooms`` benchmark rooms and books all of them for a group, over
+and over on fresh future dates. It compares a single batch request, one
+request per room, and a single-room booking as the baseline. Benchmark
+rooms (and their bookings) are removed afterwards.
+
+    python benchmarks/bench_booking_batch.py --rooms 40 --repeat 20
+"""
+import argparse
+from datetime import date, timedelta
+
+import common
+from sync_database import get_db_connection, close_db_connection
+
+ROOM_PREFIX = "BB"
+
+
+def setup(rooms):
+    connection = get_db_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute("DELETE FROM rooms WHERE room_number LIKE %s", (ROOM_PREFIX + "-%",))
+        cursor.execute("""
+            INSERT INTO rooms (room_number, room_type, price, status)
+            SELECT %s || '-' || lpad(n::text, 4, '0'), 'Double', 800, 'available'
+            FROM generate_series(1, %s) AS n
+            RETURNING id
+        """, (ROOM_PREFIX, rooms))
+        room_ids = [row[0] for row in cursor.fetchall()]
+        cursor.execute("""
+            INSERT INTO guests (first_name, last_name, email, phone)
+            VALUES ('Bench', 'Group', 'bench.batch@example.com', '000')
+            ON CONFLICT (email) DO UPDATE SET phone = EXCLUDED.phone
+            RETURNING id
+        """)
+        guest_id = cursor.fetchone()[0]
+        connection.commit()
+        return room_ids, guest_id
+    finally:
+        close_db_connection(connection)
+
+
+def cleanup():
+    connection = get_db_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute("DELETE FROM bookings WHERE room_id IN (SELECT id FROM rooms WHERE room_number LIKE %s)",
+                       (ROOM_PREFIX + "-%",))
+        cursor.execute("DELETE FROM rooms WHERE room_number LIKE %s", (ROOM_PREFIX + "-%",))
+        connection.commit()
+    finally:
+        close_db_connection(connection)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+
+    import httpx
+
+    room_ids, guest_id = setup(args.rooms)
+    # Each run books a fresh two-night stay, far enough ahead to never flip room status
+    stays = iter(date.today() + timedelta(days=365 + 3 * n) for n in range(10 * args.repeat + 10))
+
+    def group(room_ids):
+        check_in = next(stays)
+        return [{"guest_id": guest_id, "room_id": room_id, "check_in_date": check_in.isoformat(),
+                 "check_out_date": (check_in + timedelta(days=2)).isoformat(), "total_amount": 1600}
+                for room_id in room_ids]
+
+    results = {"rooms": args.rooms}
+    try:
+        with common.serve("main:app", args.port) as base_url, httpx.Client(base_url=base_url, timeout=60) as client:
+            def batch():
+                client.post("/bookings/batch", json={"bookings": group(room_ids)}).raise_for_status()
+
+            def one_by_one():
+                for booking in group(room_ids):
+                    client.post("/bookings", json=booking).raise_for_status()
+
+            def single():
+                client.post("/bookings", json=group(room_ids[:1])[0]).raise_for_status()
+
+            results["single_booking"], _ = common.timed(single, repeat=args.repeat)
+            results["batch"], _ = common.timed(batch, repeat=args.repeat)
+            results["one_request_per_room"], _ = common.timed(one_by_one, repeat=max(1, args.repeat // 4))
+    finally:
+        cleanup()
+
+    common.report(results)
+
+
+if __name__ == "__main__":
+    main()
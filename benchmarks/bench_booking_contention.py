@@ -0,0 +1,100 @@
+"""Hammer POST /bookings for a single hot room and check for double-bookings.
+
+Every client asks for a random short stay inside the same window, so most
+requests collide. The run reports request and accepted-booking throughput,
+the status code mix (200 created, 409 conflict) and the number of
+overlapping active bookings left in the table, which must be zero.
+
+    python benchmarks/bench_booking_contention.py --concurrency 50 --duration 10
+"""
+import argparse
+import asyncio
+import random
+from datetime import date, timedelta
+
+import common
+from sync_database import get_db_connection, close_db_connection
+
+HOT_ROOM_NUMBER = "BENCH-HOT"
+
+
+def setup():
+    connection = get_db_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute("DELETE FROM rooms WHERE room_number = %s", (HOT_ROOM_NUMBER,))
+        cursor.execute("""
+            INSERT INTO rooms (room_number, room_type, price, status)
+            VALUES (%s, 'Suite', 1000, 'available') RETURNING id
+        """, (HOT_ROOM_NUMBER,))
+        room_id = cursor.fetchone()[0]
+        cursor.execute("""
+            INSERT INTO guests (first_name, last_name, email, phone)
+            VALUES ('Bench', 'Guest', 'bench.contention@example.com', '000')
+            ON CONFLICT (email) DO UPDATE SET phone = EXCLUDED.phone
+            RETURNING id
+        """)
+        guest_id = cursor.fetchone()[0]
+        connection.commit()
+        return room_id, guest_id
+    finally:
+        close_db_connection(connection)
+
+
+def count_double_bookings(room_id):
+    connection = get_db_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute("""
+            SELECT COUNT(*) FROM bookings a
+            JOIN bookings b ON a.room_id = b.room_id AND a.id < b.id
+            WHERE a.room_id = %s
+            AND a.status IN ('confirmed', 'checked-in')
+            AND b.status IN ('confirmed', 'checked-in')
+            AND a.check_in_date < b.check_out_date
+            AND b.check_in_date < a.check_out_date
+        """, (room_id,))
+        double_bookings = cursor.fetchone()[0]
+        cursor.execute("DELETE FROM rooms WHERE id = %s", (room_id,))
+        connection.commit()
+        return double_bookings
+    finally:
+        close_db_connection(connection)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--window-days", type=int, default=60,
+                        help="width of the date window all requests compete for")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    room_id, guest_id = setup()
+    # Future dates so the room is never flipped to occupied mid-run
+    first_night = date.today() + timedelta(days=30)
+
+    def booking_request():
+        check_in = first_night + timedelta(days=rng.randrange(args.window_days))
+        nights = rng.randint(1, 4)
+        return ("POST", "/bookings", {"json": {
+            "guest_id": guest_id,
+            "room_id": room_id,
+            "check_in_date": check_in.isoformat(),
+            "check_out_date": (check_in + timedelta(days=nights)).isoformat(),
+            "total_amount": nights * 1000,
+        }})
+
+    with common.serve("main:app", args.port) as base_url:
+        result = asyncio.run(common.drive(base_url, [booking_request], args.concurrency, args.duration))
+
+    result["accepted_bookings_per_s"] = round(result["statuses"].get("200", 0) / result["duration_s"], 1)
+    result["double_bookings"] = count_double_bookings(room_id)
+    common.report(result)
+
+
+if __name__ == "__main__":
+    main()
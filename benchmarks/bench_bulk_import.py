@@ -0,0 +1,99 @@
+"""Compare POST /guests one row at a time with a single POST /guests/bulk upload.
+
+Creates ``--sample`` guests through the single-row endpoint from
+``--concurrency`` clients, then uploads ``--guests`` guests (100k by
+default) as one CSV and as one NDJSON body. Reports rows per minute for
+each path. Benchmark guests are removed afterwards.
+
+    python benchmarks/bench_bulk_import.py --guests 100000
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import common
+from sync_database import get_db_connection, close_db_connection
+
+EMAIL_DOMAIN = "bulk.bench.example.com"
+
+
+def cleanup():
+    connection = get_db_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute("DELETE FROM guests WHERE email LIKE %s", ("%@" + EMAIL_DOMAIN,))
+        connection.commit()
+    finally:
+        close_db_connection(connection)
+
+
+def guest(tag, n):
+    return {"first_name": f"Bulk{n}", "last_name": tag, "email": f"{tag}.{n}@{EMAIL_DOMAIN}",
+            "phone": f"555{n % 10000:04d}", "address": f"{n} Bench Street"}
+
+
+def as_csv(guests):
+    columns = ["first_name", "last_name", "email", "phone", "address"]
+    return ",".join(columns) + "\n" + "".join(",".join(g[c] for c in columns) + "\n" for g in guests)
+
+
+def as_ndjson(guests):
+    return "".join(json.dumps(g) + "\n" for g in guests)
+
+
+async def single_rows(base_url, count, concurrency):
+    import httpx
+
+    queue = iter(range(count))
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        async def worker():
+            for n in queue:
+                response = await client.post("/guests", json=guest("single", n))
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - start
+
+
+def upload(base_url, import_format, body):
+    import httpx
+
+    start = time.perf_counter()
+    response = httpx.post(f"{base_url}/guests/bulk", params={"format": import_format},
+                          content=body.encode(), timeout=600)
+    response.raise_for_status()
+    elapsed = time.perf_counter() - start
+    result = response.json()
+    return {"seconds": round(elapsed, 3), "inserted": result["inserted"], "errors": len(result["errors"]),
+            "rows_per_minute": round(result["inserted"] / elapsed * 60)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--guests", type=int, default=100_000)
+    parser.add_argument("--sample", type=int, default=1000,
+                        help="guests created through the single-row endpoint")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+
+    cleanup()
+    results = {"guests": args.guests}
+    try:
+        with common.serve("main:app", args.port) as base_url:
+            elapsed = asyncio.run(single_rows(base_url, args.sample, args.concurrency))
+            results["single_post"] = {"rows": args.sample, "seconds": round(elapsed, 3),
+                                      "rows_per_minute": round(args.sample / elapsed * 60)}
+            results["bulk_csv"] = upload(base_url, "csv", as_csv(guest("csv", n) for n in range(args.guests)))
+            results["bulk_ndjson"] = upload(base_url, "ndjson",
+                                            as_ndjson(guest("ndjson", n) for n in range(args.guests)))
+    finally:
+        cleanup()
+
+    common.report(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Latency of GET /availability/calendar against one /available-rooms call per night.
+
+Starts the backend and requests the room x day grid for windows of
+``--windows`` days starting at ``--start``. It compares that with answering the
+same question the old way, one single-night ``/available-rooms`` search per
+day of the window. It also reports the CPU time of paint_calendar alone on
+the fetched stays. Seed a production-sized dataset first, e.g. as below.
+``--start`` defaults to generate_data.py's default ``--as-of``, where its
+bookings are.
+
+    python benchmarks/generate_data.py --truncate --rooms 500 --guests 50000 --bookings 300000
+    python benchmarks/bench_calendar.py --windows 30,90 --repeat 20
+"""
+import argparse
+import time
+from datetime import date, timedelta
+
+import common
+import psycopg
+from async_database import get_conninfo
+from availability import CALENDAR_STAYS_QUERY, paint_calendar
+from generate_data import DEFAULT_AS_OF
+
+
+def main():
+    import httpx
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--windows", default="30,90", help="comma-separated window lengths in days")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--start", type=date.fromisoformat, default=DEFAULT_AS_OF, help="first night of each window")
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+
+    start = args.start
+    results = {}
+    with common.serve("main:app", args.port) as base_url, httpx.Client(base_url=base_url) as client:
+        for days in map(int, args.windows.split(",")):
+            end = start + timedelta(days=days - 1)
+
+            def calendar():
+                response = client.get("/availability/calendar", params={"from": start.isoformat(), "to": end.isoformat()})
+                response.raise_for_status()
+                return response.json()
+
+            def per_night():
+                for offset in range(days):
+                    night = start + timedelta(days=offset)
+                    client.get("/available-rooms", params={"check_in": night.isoformat(),
+                                                          "check_out": (night + timedelta(days=1)).isoformat()}
+                               ).raise_for_status()
+
+            calendar_latency, body = common.timed(calendar, repeat=args.repeat)
+            per_night_latency, _ = common.timed(per_night, repeat=max(1, args.repeat // 5))
+
+            with psycopg.connect(get_conninfo()) as connection:
+                stays = connection.execute(CALENDAR_STAYS_QUERY, {"date_from": start, "date_to": end,
+                                                                  "days": days}).fetchall()
+            began = time.process_time()
+            for _ in range(args.repeat):
+                paint_calendar(body["rooms"]["id"], stays, days)
+            paint_ms = (time.process_time() - began) * 1000 / args.repeat
+
+            results[f"{days}_days"] = {
+                "rooms": len(body["grid"]),
+                "stays": len(stays),
+                "calendar": calendar_latency,
+                "per_night_available_rooms": per_night_latency,
+                "paint_cpu_ms": round(paint_ms, 3),
+            }
+    common.report(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Transfer size and client parse time of list pages per format and encoding.
+
+Starts the backend and fetches one ``--limit`` page of GET /guests and
+/bookings as row JSON, columnar JSON and Arrow, each uncompressed, gzip and
+Brotli. For every combination it reports the bytes on the wire and the
+request latency, plus the client-side time to turn the page into a pandas
+DataFrame the way the frontend does. Seed a larger dataset first (see
+generate_data.py), since the sample rows fit in a single small page.
+
+    python benchmarks/bench_formats.py --limit 500 --repeat 50
+"""
+import argparse
+
+import common
+import pandas as pd
+import pyarrow as pa
+
+PARSERS = {
+    "json": lambda response: pd.DataFrame(response.json()["items"]),
+    "columnar": lambda response: pd.DataFrame(response.json()["items"]),
+    "arrow": lambda response: pa.ipc.open_stream(response.content).read_all().to_pandas(types_mapper=pd.ArrowDtype),
+}
+ENCODINGS = ["identity", "gzip", "br"]
+
+
+def main():
+    import httpx
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+
+    results = {"limit": args.limit}
+    with common.serve("main:app", args.port) as base_url, httpx.Client(base_url=base_url) as client:
+        for endpoint in ("/guests", "/bookings"):
+            results[endpoint] = {}
+            for page_format, parse in PARSERS.items():
+                for encoding in ENCODINGS:
+                    def fetch():
+                        response = client.get(endpoint, params={"limit": args.limit, "format": page_format},
+                                              headers={"Accept-Encoding": encoding})
+                        response.raise_for_status()
+                        return response
+
+                    latency, response = common.timed(fetch, repeat=args.repeat)
+                    parse_latency, frame = common.timed(parse, response, repeat=args.repeat)
+                    results[endpoint][f"{page_format}/{encoding}"] = {
+                        "rows": len(frame),
+                        "wire_bytes": response.num_bytes_downloaded,
+                        "request": latency,
+                        "parse_mean_ms": parse_latency["mean_ms"],
+                    }
+    common.report(results)
+
+
+if __name__ == "__main__":
+    main()
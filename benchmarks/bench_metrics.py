@@ -0,0 +1,41 @@
+"""Measure the overhead of request/statement metrics on the GET /rooms hot path.
+
+Starts the backend with METRICS_ENABLED=0 and =1 in turn, ``--rounds``
+times each, and drives GET /rooms for ``--duration`` seconds per run.
+Reports the best throughput seen in each mode and the relative overhead.
+
+    python benchmarks/bench_metrics.py --concurrency 20 --duration 10 --rounds 3
+"""
+import argparse
+import asyncio
+
+import common
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+
+    runs = {"metrics_off": [], "metrics_on": []}
+    for _ in range(args.rounds):
+        # Alternate the modes so drift on the machine affects both alike
+        for mode, enabled in (("metrics_off", "0"), ("metrics_on", "1")):
+            with common.serve("main:app", args.port, env={"METRICS_ENABLED": enabled}) as base_url:
+                # Warm the pool and the room cache before timing
+                asyncio.run(common.drive(base_url, [("GET", "/rooms", {})], args.concurrency, 1))
+                runs[mode].append(asyncio.run(
+                    common.drive(base_url, [("GET", "/rooms", {})], args.concurrency, args.duration)))
+
+    results = {mode: max(mode_runs, key=lambda run: run["throughput_rps"]) for mode, mode_runs in runs.items()}
+    off = results["metrics_off"]["throughput_rps"]
+    on = results["metrics_on"]["throughput_rps"]
+    results["throughput_overhead_pct"] = round((off - on) / off * 100, 2)
+    common.report(results)
+
+
+if __name__ == "__main__":
+    main()
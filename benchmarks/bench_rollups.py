@@ -0,0 +1,101 @@
+"""Time year-range occupancy queries on the daily rollup against the raw bookings table.
+
+Seeds the same booking history as bench_availability.py (1M bookings by
+default) and times:
+
+- a full rebuild of daily_room_type_stats
+- an incremental refresh of one week, which is what a booking change triggers
+- the /stats/occupancy query for a one-year window, read from the rollup
+- the same numbers computed directly from bookings
+
+    python benchmarks/bench_rollups.py --rooms 500 --bookings 1000000
+"""
+import argparse
+import time
+from datetime import date, timedelta
+
+import common
+from bench_availability import cleanup, seed
+from sync_database import get_db_connection, close_db_connection
+
+ROLLUP_QUERY = """
+    WITH inventory AS (
+        SELECT room_type, COUNT(*) AS rooms FROM rooms GROUP BY room_type
+    )
+    SELECT night::date AS day, i.room_type, i.rooms,
+           COALESCE(s.room_nights, 0) AS room_nights,
+           COALESCE(s.revenue, 0) AS revenue
+    FROM generate_series(%(date_from)s::date, %(date_to)s::date, interval '1 day') AS night
+    CROSS JOIN inventory i
+    LEFT JOIN daily_room_type_stats s ON s.day = night::date AND s.room_type = i.room_type
+    ORDER BY 1, 2
+"""
+
+RAW_QUERY = """
+    SELECT night::date AS day, r.room_type, COUNT(*) AS room_nights,
+           SUM(b.total_amount::numeric / (b.check_out_date - b.check_in_date)) AS revenue
+    FROM bookings b
+    JOIN rooms r ON b.room_id = r.id
+    CROSS JOIN LATERAL generate_series(GREATEST(b.check_in_date, %(date_from)s),
+                                       LEAST(b.check_out_date, %(date_to)s + 1) - 1,
+                                       interval '1 day') AS night
+    WHERE b.status IN ('confirmed', 'checked-in', 'checked-out')
+    AND b.stay && daterange(%(date_from)s, %(date_to)s, '[]')
+    GROUP BY 1, 2
+    ORDER BY 1, 2
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=500)
+    parser.add_argument("--bookings", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true", help="leave the seeded rows in place")
+    args = parser.parse_args()
+
+    year = {"date_from": date.today() - timedelta(days=365), "date_to": date.today()}
+    week = (date.today() - timedelta(days=30), date.today() - timedelta(days=23))
+
+    connection = get_db_connection()
+    try:
+        cursor = connection.cursor()
+        cleanup(cursor)
+        seeded = seed(cursor, args.rooms, args.bookings, args.seed / 2 ** 31)
+        connection.commit()
+        results = {"rooms": args.rooms, "bookings": seeded}
+
+        start = time.perf_counter()
+        cursor.execute("SELECT refresh_daily_room_type_stats(MIN(check_in_date), MAX(check_out_date)) FROM bookings")
+        connection.commit()
+        results["full_rebuild_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+        def refresh_week():
+            cursor.execute("SELECT refresh_daily_room_type_stats(%s, %s)", week)
+            connection.commit()
+
+        results["incremental_week_refresh"], _ = common.timed(refresh_week, repeat=args.repeat)
+
+        def run(query):
+            cursor.execute(query, year)
+            return cursor.fetchall()
+
+        results["year_query_rollup"], rows = common.timed(run, ROLLUP_QUERY, repeat=args.repeat)
+        results["year_query_rollup"]["rows"] = len(rows)
+        results["year_query_raw_bookings"], rows = common.timed(run, RAW_QUERY, repeat=max(1, args.repeat // 5))
+        results["year_query_raw_bookings"]["rows"] = len(rows)
+        connection.rollback()
+
+        if not args.keep:
+            cleanup(cursor)
+            cursor.execute("SELECT refresh_daily_room_type_stats(MIN(check_in_date), MAX(check_out_date)) FROM bookings")
+            connection.commit()
+    finally:
+        close_db_connection(connection)
+
+    common.report(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Shared helpers for the backend benchmarks.
+
+Every benchmark talks to the database configured for the backend
+(DATABASE_URL or the DB_* variables, see backend/db_config.py) and prints
+its results as JSON so runs can be diffed.
+"""
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.join(os.path.dirname(BENCH_DIR), "backend")
+
+# The backend uses flat imports (``from db_config import ...``)
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+def summarize(samples):
+    """Latency summary in milliseconds for a list of durations in seconds"""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def pct(p):
+        return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000, 3)
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": pct(50),
+        "p95_ms": pct(95),
+        "p99_ms": pct(99),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def timed(fn, *args, repeat=20, **kwargs):
+    """Run fn repeatedly and return (latency summary, last result)"""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples), result
+
+
+@contextmanager
+def serve(app_path, port, env=None):
+    """Run ``module:app`` under uvicorn in a subprocess until the block exits"""
+    import httpx
+
+    process_env = dict(os.environ, **(env or {}))
+    process_env["PYTHONPATH"] = os.pathsep.join(
+        [BACKEND_DIR, BENCH_DIR, process_env.get("PYTHONPATH", "")]
+    )
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app_path,
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=process_env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                httpx.get(f"{base_url}/", timeout=1)
+                break
+            except httpx.TransportError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError(f"uvicorn {app_path} failed to start")
+                time.sleep(0.2)
+        yield base_url
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+async def drive(base_url, requests, concurrency, duration):
+    """Replay ``requests`` round-robin from ``concurrency`` workers for ``duration`` seconds.
+
+    ``requests`` is a list of ``(method, path, kwargs)`` tuples, or callables
+    returning one so workers can randomise parameters per call. A tuple may
+    start with a label, ``(label, method, path, kwargs)``, to also get
+    statuses and latency per label under ``operations``.
+    """
+    import httpx
+
+    samples = []
+    statuses = {}
+    operations = {}
+    deadline = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def worker(offset):
+            i = offset
+            while time.monotonic() < deadline:
+                spec = requests[i % len(requests)]
+                spec = spec() if callable(spec) else spec
+                label, (method, path, kwargs) = (spec[0], spec[1:]) if len(spec) == 4 else (None, spec)
+                i += 1
+                start = time.perf_counter()
+                try:
+                    response = await client.request(method, path, **kwargs)
+                    status = response.status_code
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                elapsed = time.perf_counter() - start
+                samples.append(elapsed)
+                statuses[status] = statuses.get(status, 0) + 1
+                if label is not None:
+                    operation = operations.setdefault(label, {"samples": [], "statuses": {}})
+                    operation["samples"].append(elapsed)
+                    operation["statuses"][status] = operation["statuses"].get(status, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    result = {
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(len(samples) / elapsed, 1),
+        "statuses": {str(k): v for k, v in sorted(statuses.items(), key=str)},
+        "latency": summarize(samples),
+    }
+    if operations:
+        result["operations"] = {
+            label: {
+                "throughput_rps": round(len(operation["samples"]) / elapsed, 1),
+                "statuses": {str(k): v for k, v in sorted(operation["statuses"].items(), key=str)},
+                "latency": summarize(operation["samples"]),
+            }
+            for label, operation in sorted(operations.items())
+        }
+    return result
+
+
+def report(results):
+    """Print benchmark results as JSON"""
+    print(json.dumps(results, indent=2, default=str))
@@ -0,0 +1,286 @@
+"""Fill rooms, guests and bookings with a large, production-shaped dataset.
+
+Bookings follow the seasons (a summer peak and the year-end holidays), with
+check-ins clustered on Fridays and Saturdays. A share of the guests come
+back again and again, about 8% of stays are cancelled, and every stay has
+a realistic booking lead time in created_at. Stays never overlap within a
+room and always satisfy the bookings CHECK constraints.
+
+Dates are drawn with vectorized NumPy, a block of rooms at a time, and the
+rows are streamed into COPY, so memory stays flat however many bookings are
+asked for. Stay statuses and timestamps are relative to --as-of, a fixed
+date by default, so the same --seed and --as-of always produce the same data.
+
+The tables must be empty; --truncate clears them first (including the
+sample rows from database/init.sql). Uses DATABASE_URL or the DB_*
+variables, like the backend.
+
+    python benchmarks/generate_data.py --truncate --rooms 20000 --guests 2000000 --bookings 20000000
+"""
+import argparse
+import math
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+import common
+
+ROOM_TYPES = np.array(["Single", "Double", "Suite", "Deluxe"])
+ROOM_TYPE_SHARE = [0.3, 0.4, 0.2, 0.1]
+BASE_PRICES = np.array([500, 800, 1500, 2000])
+ROOMS_PER_FLOOR = 40
+
+FIRST_NAMES = np.array([
+    "James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+    "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Carlos", "Karen",
+    "Daniel", "Lisa", "Matthew", "Nancy", "Anthony", "Sandra", "Mark", "Ashley", "Wei", "Priya",
+    "Ahmed", "Fatima", "Hiroshi", "Yuki", "Luca", "Sofia", "Mateo", "Olga", "Kwame", "Amara",
+])
+LAST_NAMES = np.array([
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+    "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
+    "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez", "Clark", "Ramirez", "Lewis", "Robinson",
+    "Chen", "Patel", "Khan", "Tanaka", "Rossi", "Novak", "Silva", "Mensah", "Kim", "Nguyen",
+])
+STREETS = np.array(["Main St", "Oak Ave", "Pine Rd", "Maple Dr", "Cedar Ln", "Elm St", "Lake View", "Hill Rd"])
+CITIES = np.array(["Springfield", "Riverside", "Fairview", "Madison", "Georgetown", "Franklin", "Clinton"])
+
+# Length of stay in nights and how often each occurs
+NIGHTS = np.array([1, 2, 3, 4, 5, 6, 7, 10, 14])
+NIGHTS_SHARE = np.array([0.24, 0.30, 0.17, 0.10, 0.06, 0.04, 0.05, 0.025, 0.015])
+MEAN_NIGHTS = float(NIGHTS @ NIGHTS_SHARE)
+# Check-in weight by weekday, Monday first
+CHECK_IN_WEEKDAY = np.array([0.8, 0.8, 0.85, 0.95, 1.7, 1.4, 0.7])
+
+CANCELLED_SHARE = 0.08
+# Share of bookings made by the most loyal guests, and how many guests that is
+REPEAT_BOOKING_SHARE = 0.35
+REPEAT_GUEST_SHARE = 0.05
+
+# Rows generated per COPY block
+BLOCK_ROWS = 200_000
+
+# The "today" stay statuses and timestamps are generated against, unless --as-of is given
+DEFAULT_AS_OF = date(2025, 1, 1)
+
+
+def check_in_weights(first_day, days):
+    """Relative chance of a stay starting on each day: season x weekday"""
+    day = np.datetime64(first_day, "D") + np.arange(days)
+    day_of_year = (day - day.astype("datetime64[Y]")).astype(int)
+    season = 1 + 0.35 * np.cos(2 * np.pi * (day_of_year - 200) / 365.25)
+    # Christmas to New Year
+    season += 0.5 * ((day_of_year >= 354) | (day_of_year <= 1))
+    weekday = (day.astype(int) + 3) % 7  # 1970-01-01 was a Thursday
+    weights = season * CHECK_IN_WEEKDAY[weekday]
+    return weights / weights.sum()
+
+
+def to_text(values):
+    return values.astype(str)
+
+
+def copy_block(cursor, table, columns, block):
+    """Stream one block of rows, given as columns of strings, through COPY"""
+    rows = zip(*(values.tolist() for values in block))
+    with cursor.copy(f"COPY {table} ({', '.join(columns)}) FROM STDIN") as copy:
+        copy.write("\n".join(map("\t".join, rows)) + "\n")
+
+
+def generate_rooms(cursor, rng, count):
+    index = np.arange(count)
+    floor = index // ROOMS_PER_FLOOR + 1
+    kind = rng.choice(len(ROOM_TYPES), size=count, p=ROOM_TYPE_SHARE)
+    # Higher floors cost a little more; prices are rounded to 10
+    price = (BASE_PRICES[kind] * (1 + 0.01 * np.minimum(floor, 30)) // 10 * 10).astype(int)
+    numbers = np.char.add(to_text(floor), np.char.zfill(to_text(index % ROOMS_PER_FLOOR + 1), 2))
+    copy_block(cursor, "rooms", ["room_number", "room_type", "price", "status"],
+               [numbers, ROOM_TYPES[kind], to_text(price), np.full(count, "available")])
+    cursor.execute("SELECT id, price FROM rooms ORDER BY id")
+    rows = cursor.fetchall()
+    return np.array([row[0] for row in rows]), np.array([row[1] for row in rows])
+
+
+def generate_guests(cursor, rng, count, first_day, as_of):
+    now = np.datetime64(as_of, "s")
+    registered_from = np.datetime64(first_day, "s") - np.timedelta64(365, "D")
+    for start in range(0, count, BLOCK_ROWS):
+        n = np.arange(start, min(count, start + BLOCK_ROWS))
+        first = FIRST_NAMES[rng.integers(len(FIRST_NAMES), size=len(n))]
+        last = LAST_NAMES[rng.integers(len(LAST_NAMES), size=len(n))]
+        email = np.char.lower(np.char.add(np.char.add(np.char.add(first, "."), last),
+                                          np.char.add(np.char.add(".", to_text(n + 1)), "@example.com")))
+        phone = np.char.add("555-", np.char.zfill(to_text(rng.integers(10_000_000, size=len(n))), 7))
+        address = np.char.add(np.char.add(to_text(rng.integers(1, 9999, size=len(n))), " "),
+                              np.char.add(np.char.add(STREETS[rng.integers(len(STREETS), size=len(n))], ", "),
+                                          CITIES[rng.integers(len(CITIES), size=len(n))]))
+        seconds = int((now - registered_from) / np.timedelta64(1, "s"))
+        created = registered_from + rng.integers(seconds, size=len(n)).astype("timedelta64[s]")
+        copy_block(cursor, "guests", ["first_name", "last_name", "email", "phone", "address", "created_at"],
+                   [first, last, email, phone, address, to_text(created)])
+    cursor.execute("SELECT min(id), max(id) FROM guests")
+    return cursor.fetchone()
+
+
+def generate_bookings(cursor, rng, room_ids, prices, guest_range, per_room, first_day, days, as_of):
+    """Place per_room non-overlapping stays in every room, a block of rooms at a time"""
+    cdf = np.cumsum(check_in_weights(first_day, days))
+    today = (as_of - first_day).days
+    now = np.datetime64(as_of, "s")
+    day_zero = np.datetime64(first_day, "D")
+    first_guest, last_guest = guest_range
+    repeat_guests = max(1, int((last_guest - first_guest + 1) * REPEAT_GUEST_SHARE))
+    # Same-day check-ins collapse into one stay, so draw a few spare ones
+    drawn = math.ceil(per_room * 1.25) + 2
+    block_rooms = max(1, BLOCK_ROWS // per_room)
+    inserted = 0
+
+    for start in range(0, len(room_ids), block_rooms):
+        rooms = slice(start, start + block_rooms)
+        count = len(room_ids[rooms])
+        check_in = np.minimum(np.searchsorted(cdf, rng.random((count, drawn)), side="right"), days - 1)
+        check_in.sort(axis=1)
+        nights = rng.choice(NIGHTS, size=(count, drawn), p=NIGHTS_SHARE)
+        # A stay ends by the next one's check-in at the latest, so stays never overlap
+        next_check_in = np.empty_like(check_in)
+        next_check_in[:, :-1] = check_in[:, 1:]
+        next_check_in[:, -1] = days + NIGHTS[-1]
+        check_out = np.minimum(check_in + nights, next_check_in)
+        # Keep per_room stays per room, chosen at random among the valid ones
+        keys = np.where(check_out > check_in, rng.random((count, drawn)), np.inf)
+        cutoff = np.partition(keys, per_room - 1, axis=1)[:, per_room - 1:per_room]
+        keep = (keys <= cutoff) & np.isfinite(keys)
+
+        room_index = np.broadcast_to(np.arange(start, start + count)[:, None], keep.shape)[keep]
+        check_in, check_out = check_in[keep], check_out[keep]
+        n = len(check_in)
+        stay_nights = check_out - check_in
+        # Week-long stays and longer get 10% off
+        amount = prices[room_index] * stay_nights * np.where(stay_nights >= 7, 0.9, 1.0)
+        guest = np.where(rng.random(n) < REPEAT_BOOKING_SHARE,
+                         first_guest + rng.integers(repeat_guests, size=n),
+                         rng.integers(first_guest, last_guest + 1, size=n))
+        status = np.select(
+            [rng.random(n) < CANCELLED_SHARE, check_out <= today, check_in <= today],
+            ["cancelled", "checked-out", "checked-in"], "confirmed")
+        # Booked 0-365 days ahead (three weeks on average), never in the future
+        lead = np.minimum(rng.exponential(21 * 86400, size=n), 365 * 86400).astype("timedelta64[s]")
+        created = np.minimum((day_zero + check_in).astype("datetime64[s]") + np.timedelta64(14, "h") - lead, now)
+
+        copy_block(cursor, "bookings",
+                   ["guest_id", "room_id", "check_in_date", "check_out_date", "total_amount", "status", "created_at"],
+                   [to_text(guest), to_text(room_ids[room_index]), to_text(day_zero + check_in),
+                    to_text(day_zero + check_out), to_text(amount.astype(int)), status, to_text(created)])
+        inserted += n
+    return inserted
+
+
+def drop_indexes(cursor, table):
+    """Drop a table's indexes and exclusion constraints, returning the DDL to recreate them"""
+    cursor.execute("""
+        SELECT 'ALTER TABLE ' || quote_ident(%(table)s) || ' ADD CONSTRAINT ' || quote_ident(conname)
+                   || ' ' || pg_get_constraintdef(oid),
+               'ALTER TABLE ' || quote_ident(%(table)s) || ' DROP CONSTRAINT ' || quote_ident(conname)
+        FROM pg_constraint WHERE conrelid = %(table)s::regclass AND contype = 'x'
+        UNION ALL
+        SELECT indexdef, 'DROP INDEX ' || quote_ident(indexname)
+        FROM pg_indexes i
+        WHERE tablename = %(table)s AND schemaname = current_schema()
+        AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conname = i.indexname)
+    """, {"table": table})
+    statements = cursor.fetchall()
+    for _, drop in statements:
+        cursor.execute(drop)
+    return [create for create, _ in statements]
+
+
+def generate(connection, rooms, guests, bookings, seed=42, as_of=DEFAULT_AS_OF, end=None, occupancy=0.65,
+             truncate=False, log=print):
+    """Generate the dataset in one transaction and return row counts and timings.
+
+    as_of is the day treated as today: stays before it are checked out, stays
+    spanning it checked in, and no guest or booking is created after it.
+    """
+    rng = np.random.default_rng(seed)
+    per_room = max(1, bookings // rooms)
+    end = end or as_of + timedelta(days=180)
+    # Long enough for per_room stays to fill about `occupancy` of the nights
+    days = math.ceil(per_room * MEAN_NIGHTS / occupancy)
+    first_day = end - timedelta(days=days)
+    timings = {}
+
+    with connection.cursor() as cursor:
+        if truncate:
+            cursor.execute("TRUNCATE bookings, guests, rooms, daily_room_type_stats RESTART IDENTITY")
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM rooms) OR EXISTS (SELECT 1 FROM guests)")
+        if cursor.fetchone()[0]:
+            raise SystemExit("rooms/guests are not empty; pass --truncate to clear them first")
+
+        started = time.perf_counter()
+        room_ids, prices = generate_rooms(cursor, rng, rooms)
+        timings["rooms_s"] = round(time.perf_counter() - started, 2)
+
+        # Building the indexes once at the end is much cheaper than maintaining them row by row
+        started = time.perf_counter()
+        recreate = drop_indexes(cursor, "guests")
+        guest_range = generate_guests(cursor, rng, guests, first_day, as_of)
+        timings["guests_s"] = round(time.perf_counter() - started, 2)
+        log(f"{rooms} rooms and {guests} guests loaded; placing bookings from {first_day} to {end}")
+
+        started = time.perf_counter()
+        recreate += drop_indexes(cursor, "bookings")
+        inserted = generate_bookings(cursor, rng, room_ids, prices, guest_range, per_room, first_day, days, as_of)
+        timings["bookings_s"] = round(time.perf_counter() - started, 2)
+
+        started = time.perf_counter()
+        for statement in recreate:
+            cursor.execute(statement)
+        cursor.execute("""
+            UPDATE rooms SET status = 'occupied'
+            WHERE id IN (SELECT room_id FROM bookings WHERE status = 'checked-in')
+        """)
+        timings["indexes_s"] = round(time.perf_counter() - started, 2)
+
+        started = time.perf_counter()
+        cursor.execute("SELECT refresh_daily_room_type_stats(%s, %s)",
+                       (first_day, end + timedelta(days=int(NIGHTS[-1]))))
+        timings["rollup_s"] = round(time.perf_counter() - started, 2)
+    connection.commit()
+
+    return {"rooms": rooms, "guests": guests, "bookings": inserted,
+            "first_day": first_day, "last_day": end, "timings": timings}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=10_000)
+    parser.add_argument("--guests", type=int, default=1_000_000)
+    parser.add_argument("--bookings", type=int, default=5_000_000)
+    parser.add_argument("--occupancy", type=float, default=0.65,
+                        help="share of room-nights booked; sets how many days the bookings span")
+    parser.add_argument("--as-of", type=date.fromisoformat, default=DEFAULT_AS_OF,
+                        help=f"day treated as today for stay statuses and timestamps (default: {DEFAULT_AS_OF})")
+    parser.add_argument("--end", type=date.fromisoformat, help="last check-in date (default: 180 days after --as-of)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--truncate", action="store_true",
+                        help="clear rooms, guests and bookings first")
+    args = parser.parse_args()
+
+    import psycopg
+    from async_database import get_conninfo
+
+    started = time.perf_counter()
+    with psycopg.connect(get_conninfo()) as connection:
+        result = generate(connection, args.rooms, args.guests, args.bookings, seed=args.seed, as_of=args.as_of, end=args.end,
+                          occupancy=args.occupancy, truncate=args.truncate,
+                          log=lambda message: print(message, file=sys.stderr))
+    with psycopg.connect(get_conninfo(), autocommit=True) as connection:
+        connection.execute("VACUUM ANALYZE rooms, guests, bookings")
+    result["total_s"] = round(time.perf_counter() - started, 2)
+    common.report(result)
+
+
+if __name__ == "__main__":
+    main()
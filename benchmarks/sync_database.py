@@ -0,0 +1,99 @@
+"""psycopg2 connection pool kept for the benchmarks that compare against
+the old sync request path or drive the database from threads. The API
+itself only uses the async pool in backend/async_database.py.
+"""
+import os
+import threading
+import time
+
+import common  # noqa: F401  (puts backend/ on sys.path)
+from psycopg2 import pool, Error
+from db_config import (
+    DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_POOL_TIMEOUT, DB_POOL_HEALTHCHECK_INTERVAL,
+    PoolExhaustedError, get_connection_kwargs
+)
+
+_pool = None
+_pool_lock = threading.Lock()
+_pool_slots = threading.BoundedSemaphore(DB_POOL_MAX_SIZE)
+_last_used = {}
+
+
+def get_pool():
+    """Return the process-wide connection pool, creating it on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = pool.ThreadedConnectionPool(
+                    DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, **get_connection_kwargs()
+                )
+    return _pool
+
+
+def _is_healthy(connection):
+    """Check a pooled connection before handing it out"""
+    if connection.closed:
+        return False
+    if time.monotonic() - _last_used.get(id(connection), 0) < DB_POOL_HEALTHCHECK_INTERVAL:
+        return True
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        connection.rollback()
+        return True
+    except Error:
+        return False
+
+
+def get_db_connection():
+    """Check out a database connection from the pool.
+
+    Returns None if the database cannot be reached and raises
+    PoolExhaustedError if every connection stays busy for DB_POOL_TIMEOUT.
+    """
+    if not _pool_slots.acquire(timeout=DB_POOL_TIMEOUT):
+        raise PoolExhaustedError(
+            f"No database connection available within {DB_POOL_TIMEOUT}s"
+        )
+
+    try:
+        db_pool = get_pool()
+        connection = db_pool.getconn()
+        # Recycle connections broken by a server restart or failover
+        while not _is_healthy(connection):
+            _last_used.pop(id(connection), None)
+            db_pool.putconn(connection, close=True)
+            connection = db_pool.getconn()
+        return connection
+    except Error as e:
+        _pool_slots.release()
+        print(f"Error connecting to PostgreSQL: {e}")
+        print(f"Connection string (without password): {os.getenv('DATABASE_URL', '').split(':')[0] or 'Using individual params'}")
+        return None
+
+
+def close_db_connection(connection):
+    """Return the connection to the pool"""
+    if not connection:
+        return
+    try:
+        # The pool rolls back any open transaction and discards broken connections
+        broken = connection.closed != 0
+        get_pool().putconn(connection, close=broken)
+        if broken:
+            _last_used.pop(id(connection), None)
+        else:
+            _last_used[id(connection)] = time.monotonic()
+    finally:
+        _pool_slots.release()
+
+
+def close_pool():
+    """Close every pooled connection (called on application shutdown)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+            _last_used.clear()
@@ -6,6 +6,11 @@ CREATE DATABASE hotel_management;
 -- Connect to the database
 \c hotel_management
 
+-- btree_gist lets the bookings exclusion constraint combine room_id (=) with a date range (&&)
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+-- pg_trgm indexes the substring (ILIKE '%...%') searches on guest names, emails and phones
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 -- Create Rooms Table
 CREATE TABLE rooms (
     id SERIAL PRIMARY KEY,
@@ -38,12 +43,50 @@ CREATE TABLE bookings (
     check_out_date DATE NOT NULL,
     total_amount INTEGER NOT NULL,
     status VARCHAR(20) DEFAULT 'confirmed' CHECK (status IN ('confirmed', 'checked-in', 'checked-out', 'cancelled')),
+    stay DATERANGE GENERATED ALWAYS AS (daterange(check_in_date, check_out_date, '[)')) STORED,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (guest_id) REFERENCES guests(id) ON DELETE CASCADE,
-    FOREIGN KEY (room_id) REFERENCES rooms(id) ON DELETE CASCADE
+    FOREIGN KEY (room_id) REFERENCES rooms(id) ON DELETE CASCADE,
+    CONSTRAINT bookings_valid_dates CHECK (check_out_date > check_in_date),
+    -- A room can never hold two active bookings for overlapping nights
+    CONSTRAINT bookings_no_overlap EXCLUDE USING gist (room_id WITH =, stay WITH &&)
+        WHERE (status IN ('confirmed', 'checked-in'))
+);
+
+-- Create Daily Room Type Stats Table (rollup of sold room-nights and revenue per day)
+CREATE TABLE daily_room_type_stats (
+    day DATE NOT NULL,
+    room_type VARCHAR(50) NOT NULL,
+    room_nights INTEGER NOT NULL,
+    revenue NUMERIC(14, 2) NOT NULL,
+    PRIMARY KEY (day, room_type)
 );
 
+-- Recompute the rollup rows for the days in [from_day, to_day).
+-- Each booking's total_amount is spread evenly over its nights.
+CREATE OR REPLACE FUNCTION refresh_daily_room_type_stats(from_day DATE, to_day DATE)
+RETURNS VOID AS $$
+BEGIN
+    -- Serialize refreshes so overlapping ranges can't race on the same rows
+    PERFORM pg_advisory_xact_lock(hashtext('daily_room_type_stats'));
+
+    DELETE FROM daily_room_type_stats WHERE day >= from_day AND day < to_day;
+
+    INSERT INTO daily_room_type_stats (day, room_type, room_nights, revenue)
+    SELECT night::date, r.room_type, COUNT(*),
+           SUM(b.total_amount::numeric / (b.check_out_date - b.check_in_date))
+    FROM bookings b
+    JOIN rooms r ON b.room_id = r.id
+    CROSS JOIN LATERAL generate_series(GREATEST(b.check_in_date, from_day),
+                                       LEAST(b.check_out_date, to_day) - 1,
+                                       interval '1 day') AS night
+    WHERE b.status IN ('confirmed', 'checked-in', 'checked-out')
+    AND b.stay && daterange(from_day, to_day)
+    GROUP BY night::date, r.room_type;
+END;
+$$ language 'plpgsql';
+
 -- Create trigger function to update updated_at timestamp
 CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$
@@ -63,6 +106,65 @@ CREATE TRIGGER update_guests_updated_at BEFORE UPDATE ON guests
 CREATE TRIGGER update_bookings_updated_at BEFORE UPDATE ON bookings
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+-- Per-table change counters behind the API's ETags. A table's version is the
+-- sum of its shards. A statement-level trigger bumps one shard inside the
+-- writing transaction, so readers see the new version exactly when they can
+-- see the new rows. The trigger takes a shard no other transaction holds, so
+-- concurrent writers don't queue behind one counter row until they commit.
+CREATE TABLE table_versions (
+    table_name VARCHAR(63),
+    shard SMALLINT,
+    version BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (table_name, shard)
+);
+
+INSERT INTO table_versions (table_name, shard)
+SELECT table_name, shard
+FROM unnest(ARRAY['rooms', 'guests', 'bookings', 'daily_room_type_stats']) AS table_name
+CROSS JOIN generate_series(0, 31) AS shard;
+
+CREATE OR REPLACE FUNCTION bump_table_version()
+RETURNS TRIGGER AS $$
+DECLARE
+    picked SMALLINT;
+BEGIN
+    -- Start at a shard picked by backend so writers spread out, and skip the
+    -- ones other transactions hold. Only with every shard taken do we wait.
+    SELECT shard INTO picked FROM table_versions
+    WHERE table_name = TG_TABLE_NAME
+    ORDER BY (shard + pg_backend_pid()) % 32
+    LIMIT 1
+    FOR UPDATE SKIP LOCKED;
+    UPDATE table_versions SET version = version + 1
+    WHERE table_name = TG_TABLE_NAME AND shard = COALESCE(picked, pg_backend_pid() % 32);
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER bump_rooms_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON rooms
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+CREATE TRIGGER bump_guests_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON guests
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+CREATE TRIGGER bump_bookings_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON bookings
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+CREATE TRIGGER bump_daily_room_type_stats_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE
+    ON daily_room_type_stats
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+-- Responses of writes sent with an Idempotency-Key, replayed when the request
+-- is retried. status_code and body are NULL while the first attempt runs.
+-- Keys older than IDEMPOTENCY_TTL are purged by the API.
+CREATE TABLE idempotency_keys (
+    key VARCHAR(255) PRIMARY KEY,
+    fingerprint BYTEA NOT NULL,
+    status_code SMALLINT,
+    body BYTEA,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
 -- Insert Sample Rooms
 INSERT INTO rooms (room_number, room_type, price, status) VALUES
 ('101', 'Single', 500, 'available'),
@@ -88,8 +190,30 @@ INSERT INTO bookings (guest_id, room_id, check_in_date, check_out_date, total_am
 -- Update room status for booked rooms
 UPDATE rooms SET status = 'occupied' WHERE id IN (1, 3);
 
+-- Build the daily rollup for the sample bookings
+SELECT refresh_daily_room_type_stats(MIN(check_in_date), MAX(check_out_date)) FROM bookings;
+
 -- Create indexes for better performance
 CREATE INDEX idx_room_status ON rooms(status);
 CREATE INDEX idx_guest_email ON guests(email);
 CREATE INDEX idx_booking_dates ON bookings(check_in_date, check_out_date);
 CREATE INDEX idx_booking_status ON bookings(status);
+-- Availability search filters rooms by type and price band; date overlaps are
+-- answered by the GiST index behind bookings_no_overlap
+CREATE INDEX idx_room_type_price ON rooms(room_type, price);
+-- Keyset pagination on the guest and booking lists (newest first)
+CREATE INDEX idx_guest_created ON guests(created_at DESC, id DESC);
+CREATE INDEX idx_booking_created ON bookings(created_at DESC, id DESC);
+CREATE INDEX idx_booking_status_created ON bookings(status, created_at DESC, id DESC);
+-- Stay-overlap lookups across all statuses (rollup refreshes, list date filters)
+CREATE INDEX idx_booking_stay ON bookings USING gist (stay);
+-- Room number prefix search (GET /rooms/search)
+CREATE INDEX idx_room_number_pattern ON rooms(room_number text_pattern_ops);
+-- Purge of expired idempotency keys
+CREATE INDEX idx_idempotency_created ON idempotency_keys(created_at);
+-- Guest typeahead (GET /guests/search) and the name filters of the guest and booking lists
+CREATE INDEX idx_guest_name_trgm ON guests USING gin ((first_name || ' ' || last_name) gin_trgm_ops);
+CREATE INDEX idx_guest_email_trgm ON guests USING gin (email gin_trgm_ops);
+CREATE INDEX idx_guest_phone_trgm ON guests USING gin (phone gin_trgm_ops);
+-- Guest typeahead name prefixes, read in name order so the search stops at its limit
+CREATE INDEX idx_guest_name_prefix ON guests ((lower(first_name || ' ' || last_name) COLLATE "C"), id);
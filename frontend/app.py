@@ -1,12 +1,66 @@
 import streamlit as st
 import requests
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+from concurrent.futures import Future, ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from datetime import date, timedelta
+from urllib.parse import urlencode
 import os
+import time
+import uuid
 
 # API base URL - Use environment variable or Streamlit secrets, fallback to localhost
 API_BASE_URL = os.getenv("API_BASE_URL", st.secrets.get("API_BASE_URL", "http://localhost:8000"))
 
+# Rows requested per page from the paginated list endpoints
+PAGE_SIZE = 50
+
+# Matches listed by the typeahead search boxes
+SEARCH_LIMIT = 20
+
+# How the day codes of /availability/calendar are shown, and their cell colours
+CALENDAR_LABELS = np.array(["", "Booked", "In"])
+CALENDAR_COLORS = {"": "background-color: #90EE90", "Booked": "background-color: #FFB6C1",
+                   "In": "background-color: #FFD700"}
+
+# Responses kept per session for If-None-Match revalidation
+ETAG_CACHE_SIZE = 100
+
+# Seconds to wait for a connection to the API, and for its response
+API_TIMEOUT = (float(os.getenv("API_CONNECT_TIMEOUT", 3.05)), float(os.getenv("API_READ_TIMEOUT", 30)))
+
+# Extra attempts at a create or update that timed out or got a retryable error,
+# and the seconds before the first retry (doubled each time)
+API_WRITE_RETRIES = int(os.getenv("API_WRITE_RETRIES", 2))
+API_RETRY_BACKOFF = float(os.getenv("API_RETRY_BACKOFF", 0.5))
+
+# Requests run at once by fetch_all, and keep-alive connections kept open to the API
+FETCH_WORKERS = int(os.getenv("API_FETCH_WORKERS", 8))
+API_POOL_SIZE = int(os.getenv("API_POOL_SIZE", 20))
+
+# Seconds a fetched response is reused across reruns without asking the API, and how many are kept
+API_CACHE_TTL = int(os.getenv("API_CACHE_TTL", 60))
+API_CACHE_SIZE = int(os.getenv("API_CACHE_SIZE", 500))
+
+# Tables behind each resource's GET responses (as in the backend's ETags), and
+# the tables a write to each resource can change (deletes cascade to bookings,
+# booking status changes update rooms)
+RESOURCE_READS = {
+    "rooms": ("rooms",),
+    "available-rooms": ("rooms", "bookings"),
+    "guests": ("guests",),
+    "bookings": ("bookings", "guests", "rooms"),
+    "stats": ("rooms", "guests", "bookings"),
+    "availability": ("rooms", "bookings"),
+}
+RESOURCE_WRITES = {
+    "rooms": ("rooms", "bookings"),
+    "guests": ("guests", "bookings"),
+    "bookings": ("bookings", "rooms"),
+}
+
 # Page configuration
 st.set_page_config(
     page_title="Hotel Management System",
@@ -49,26 +103,307 @@ page = st.sidebar.radio(
 )
 
 # Helper functions
-def fetch_data(endpoint, params=None):
-    """Fetch data from API"""
+@st.cache_resource
+def get_session():
+    """Keep-alive HTTP session shared by every rerun and browser session"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=API_POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+@st.cache_resource
+def get_executor():
+    """Threads that run the requests of fetch_all concurrently"""
+    return ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="api-fetch")
+
+def request_key(endpoint, params):
+    """(endpoint, params) of a GET as a hashable key; empty params are dropped, as the API ignores them"""
+    return endpoint, tuple(sorted((name, value) for name, value in (params or {}).items() if value not in (None, "")))
+
+def get_json(session, key, headers, parse):
+    """GET a request_key and return (response, data). Runs on the fetch threads, so it must not touch st"""
+    endpoint, params = key
+    response = session.get(f"{API_BASE_URL}{endpoint}", params=dict(params), headers=headers, timeout=API_TIMEOUT)
+    if response.status_code == 304:
+        return response, None
+    response.raise_for_status()
+    return response, parse(response) if parse else response.json()
+
+def run_inline(fn, *args):
+    """Run fn now and wrap its outcome in a Future, like ThreadPoolExecutor.submit"""
+    future = Future()
     try:
-        response = requests.get(f"{API_BASE_URL}{endpoint}", params=params)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        st.error(f"Error fetching data: {e}")
-        return []
+        future.set_result(fn(*args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+def revalidate_all(calls):
+    """Fetch calls concurrently, revalidating with the ETags kept in session state.
+
+    Returns (results, errors); a failed call's result is [].
+    """
+    cache = st.session_state.setdefault("etag_cache", {})
+    pending = st.session_state.setdefault("prefetched", {})
+    session = get_session()
+    submit = get_executor().submit if len(calls) > 1 else run_inline
+    jobs = []
+    for endpoint, params, *parse in calls:
+        key = request_key(endpoint, params)
+        prefetched = pending.pop(key, None)
+        if prefetched and prefetched[0] == generations_of([endpoint]):
+            # Already requested in the background by prefetch()
+            jobs.append((key, *prefetched[2:]))
+            continue
+        cached = cache.get(key)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+        jobs.append((key, cached, submit(get_json, session, key, headers, parse[0] if parse else None)))
+
+    results = []
+    errors = []
+    for key, cached, future in jobs:
+        try:
+            response, data = future.result()
+        except requests.exceptions.RequestException as e:
+            errors.append(f"Error fetching data: {e}")
+            results.append([])
+            continue
+        if response.status_code == 304 and cached:
+            results.append(cached[1])
+            continue
+        cache.pop(key, None)
+        if response.headers.get("ETag"):
+            cache[key] = (response.headers["ETag"], data)
+            while len(cache) > ETAG_CACHE_SIZE:
+                cache.pop(next(iter(cache)))
+        results.append(data)
+    return results, errors
+
+class FetchError(Exception):
+    """Raised out of cached_fetch_all so that results with failed calls are not cached"""
+
+    def __init__(self, results, errors):
+        super().__init__("; ".join(errors))
+        self.results = results
+        self.errors = errors
+
+@st.cache_resource
+def table_generations():
+    """Write counters per table, shared by all sessions; bumping one retires the cached reads of that table"""
+    return {}
+
+def resource_tables(endpoint):
+    """The tables a GET of endpoint reads"""
+    return RESOURCE_READS.get(endpoint.strip("/").split("/")[0], ())
+
+def generations_of(endpoints):
+    """Current generations of the tables that GETs of endpoints read"""
+    generations = table_generations()
+    tables = sorted({table for endpoint in endpoints for table in resource_tables(endpoint)})
+    return tuple(generations.get(table, 0) for table in tables)
+
+@st.cache_data(ttl=API_CACHE_TTL, max_entries=API_CACHE_SIZE, show_spinner=False)
+def cached_fetch_all(keys, generations, _calls):
+    """revalidate_all, cached per endpoint and params and the generations of the tables they read"""
+    results, errors = revalidate_all(_calls)
+    if errors:
+        raise FetchError(results, errors)
+    return results
+
+def invalidate(endpoint):
+    """Drop the cached reads that a successful write to endpoint may have changed"""
+    generations = table_generations()
+    for table in RESOURCE_WRITES.get(endpoint.strip("/").split("/")[0], ()):
+        generations[table] = generations.get(table, 0) + 1
+
+def fetch_all(*calls):
+    """Fetch several endpoints concurrently.
+
+    Each call is (endpoint, params) or (endpoint, params, parse), as for
+    fetch_data, and the results come back in the same order. A page that
+    needs several independent resources waits about as long as the slowest.
+    Results are reused for API_CACHE_TTL seconds until a write invalidates
+    them, so a rerun with nothing changed makes no API calls at all.
+    """
+    keys = tuple(request_key(endpoint, params) for endpoint, params, *_ in calls)
+    try:
+        results = cached_fetch_all(keys, generations_of([endpoint for endpoint, _ in keys]), calls)
+    except FetchError as e:
+        for error in e.errors:
+            st.error(error)
+        return e.results
+    # Remember what this session has cached, so prefetch() can skip it
+    recent = st.session_state.setdefault("recent_fetches", {})
+    for key in keys:
+        recent.pop(key, None)
+        recent[key] = (generations_of([key[0]]), time.monotonic())
+    while len(recent) > API_CACHE_SIZE:
+        recent.pop(next(iter(recent)))
+    return results
+
+def prefetch(*calls):
+    """Start fetching calls in the background without waiting for them.
+
+    The next fetch_all of the same call picks up the response instead of
+    sending the request again. Calls this session fetched within
+    API_CACHE_TTL, with no write since, are skipped, since they are cached.
+    """
+    cache = st.session_state.setdefault("etag_cache", {})
+    pending = st.session_state.setdefault("prefetched", {})
+    recent = st.session_state.setdefault("recent_fetches", {})
+    now = time.monotonic()
+    for key in [key for key, prefetched in pending.items() if now - prefetched[1] > API_CACHE_TTL]:
+        del pending[key]
+    for endpoint, params, *parse in calls:
+        key = request_key(endpoint, params)
+        generations = generations_of([endpoint])
+        seen = recent.get(key)
+        if key in pending or (seen and seen[0] == generations and now - seen[1] < API_CACHE_TTL):
+            continue
+        cached = cache.get(key)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+        future = get_executor().submit(get_json, get_session(), key, headers, parse[0] if parse else None)
+        pending[key] = (generations, now, cached, future)
+
+def fetch_data(endpoint, params=None, parse=None):
+    """Fetch data from API.
+
+    Responses are cached for all sessions (see fetch_all). Once that entry
+    expires they are revalidated with the ETag kept in session state, so an
+    unchanged resource comes back as an empty 304 and the body is reused.
+    Callers must not modify the returned data. parse turns the response into
+    data (default: its JSON).
+    """
+    return fetch_all((endpoint, params, parse))[0]
+
+def as_page(data):
+    """Split a list endpoint response into (items, next_cursor)"""
+    if not data:
+        return [], None
+    return data["items"], data["next_cursor"]
+
+def fetch_page(endpoint, params=None):
+    """Fetch one page of a paginated list endpoint as (items, next_cursor)"""
+    return as_page(fetch_data(endpoint, params))
+
+def read_arrow_page(response):
+    """Parse a format=arrow page into (DataFrame, next_cursor).
+
+    The columns stay Arrow-backed (pd.ArrowDtype) instead of being converted
+    to NumPy/Python objects, and st.dataframe hands them back to Arrow as is.
+    """
+    table = pa.ipc.open_stream(response.content).read_all()
+    return table.to_pandas(types_mapper=pd.ArrowDtype), response.headers.get("X-Next-Cursor")
+
+def frame_request(endpoint, params=None):
+    """fetch_all call for one page of a paginated list as an Arrow stream"""
+    return endpoint, dict(params or {}, format="arrow"), read_arrow_page
+
+def as_frame(page):
+    """The (DataFrame, next_cursor) of a frame_request result, empty if it failed"""
+    if not page:
+        return pd.DataFrame(), None
+    return page
+
+def fetch_frame(endpoint, params=None):
+    """Fetch one page of a paginated list as a (DataFrame, next_cursor) Arrow stream"""
+    return as_frame(fetch_data(*frame_request(endpoint, params)))
+
+def paginated_list(endpoint, key, params=None, frame=False):
+    """Fetch the current page of a list and render Previous/Next controls.
+
+    The cursors of the pages visited so far are kept in session state under
+    key, and paging restarts from the first page whenever params change.
+    With frame=True the page is returned as a DataFrame (see fetch_frame).
+    """
+    params = {k: v for k, v in (params or {}).items() if v}
+    if st.session_state.get(f"{key}_params") != params:
+        st.session_state[f"{key}_params"] = params
+        st.session_state[f"{key}_cursors"] = [None]
+    cursors = st.session_state[f"{key}_cursors"]
+
+    query = dict(params, limit=PAGE_SIZE)
+    if cursors[-1]:
+        query["cursor"] = cursors[-1]
+    items, next_cursor = (fetch_frame if frame else fetch_page)(endpoint, query)
+
+    col_prev, col_page, col_next = st.columns([1, 2, 1])
+    with col_prev:
+        if st.button("← Previous", key=f"{key}_prev", disabled=len(cursors) == 1):
+            cursors.pop()
+            st.rerun()
+    with col_page:
+        st.caption(f"Page {len(cursors)}")
+    with col_next:
+        if st.button("Next →", key=f"{key}_next", disabled=not next_cursor):
+            cursors.append(next_cursor)
+            st.rerun()
+    return items
+
+def search_guests(label, key):
+    """Search box for guests by name, email or phone (GET /guests/search).
+
+    Returns the best matches, or the newest guests while the box is empty,
+    so only a handful of guests is ever downloaded.
+    """
+    query = st.text_input(label, key=key, placeholder="Name, email or phone")
+    return fetch_data("/guests/search", {"q": query.strip(), "limit": SEARCH_LIMIT}) or []
+
+def calendar_frame(calendar):
+    """Turn an /availability/calendar response into a room x night DataFrame of labels"""
+    rooms = calendar["rooms"]
+    codes = np.frombuffer("".join(calendar["grid"]).encode(), dtype=np.uint8).reshape(len(calendar["grid"]), -1) - ord("0")
+    nights = pd.date_range(calendar["start"], periods=calendar["days"])
+    index = [f"{number} - {room_type}" for number, room_type in zip(rooms["room_number"], rooms["room_type"])]
+    return pd.DataFrame(CALENDAR_LABELS[codes], index=index, columns=nights.strftime("%a %d %b"))
+
+def view_selector(key, views):
+    """Switch between the views of a page.
+
+    Unlike st.tabs, only the chosen view's code runs, so only its data is
+    fetched. The data of the other views is prefetched after the page has
+    been drawn (see VIEW_PREFETCH).
+    """
+    view = st.radio("View", views, key=key, horizontal=True, label_visibility="collapsed")
+    background_views.extend(other for other in views if other != view)
+    return view
+
+def send_write(method, endpoint, data):
+    """POST or PUT data, retrying timeouts, dropped connections and retryable errors.
+
+    Every attempt carries the same Idempotency-Key, so the API applies the
+    write once and answers a retry of a finished write with its response.
+    """
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+    for attempt in range(API_WRITE_RETRIES + 1):
+        last_attempt = attempt == API_WRITE_RETRIES
+        try:
+            response = get_session().request(method, f"{API_BASE_URL}{endpoint}", json=data,
+                                             headers=headers, timeout=API_TIMEOUT)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if last_attempt:
+                raise
+        else:
+            # 503 (busy) and 409 (still in progress) come with Retry-After
+            if last_attempt or not (response.status_code in (502, 504) or "Retry-After" in response.headers):
+                return response
+        time.sleep(API_RETRY_BACKOFF * 2 ** attempt)
 
 def post_data(endpoint, data):
     """Post data to API"""
     try:
-        response = requests.post(f"{API_BASE_URL}{endpoint}", json=data)
+        response = send_write("POST", endpoint, data)
         response.raise_for_status()
+        invalidate(endpoint)
         return response.json()
     except requests.exceptions.HTTPError as e:
         # Try to extract error message from response
         try:
             error_detail = e.response.json().get('detail', str(e))
+            if isinstance(error_detail, list):
+                # Per-room results from /bookings/batch
+                error_detail = "; ".join(f"room {r['room_id']}: {r['error']}" for r in error_detail if r.get('error'))
             st.error(f"Error: {error_detail}")
         except:
             st.error(f"Error posting data: {e}")
@@ -80,8 +415,9 @@ def post_data(endpoint, data):
 def put_data(endpoint, data):
     """Update data via API"""
     try:
-        response = requests.put(f"{API_BASE_URL}{endpoint}", json=data)
+        response = send_write("PUT", endpoint, data)
         response.raise_for_status()
+        invalidate(endpoint)
         return response.json()
     except requests.exceptions.RequestException as e:
         st.error(f"Error updating data: {e}")
@@ -90,46 +426,64 @@ def put_data(endpoint, data):
 def delete_data(endpoint):
     """Delete data via API"""
     try:
-        response = requests.delete(f"{API_BASE_URL}{endpoint}")
+        response = get_session().delete(f"{API_BASE_URL}{endpoint}", timeout=API_TIMEOUT)
         response.raise_for_status()
+        invalidate(endpoint)
         return True
     except requests.exceptions.RequestException as e:
         st.error(f"Error deleting data: {e}")
         return False
 
+# The first page of data each view shows before any filter is touched
+VIEW_PREFETCH = {
+    "View Rooms": [("/rooms", None)],
+    "Availability Calendar": [("/availability/calendar", {"from": date.today().isoformat(),
+                                                          "to": (date.today() + timedelta(days=29)).isoformat()})],
+    "Update/Delete Room": [("/rooms", None)],
+    "View Guests": [frame_request("/guests", {"limit": PAGE_SIZE})],
+    "Update/Delete Guest": [("/guests/search", {"limit": SEARCH_LIMIT})],
+    "View Bookings": [frame_request("/bookings", {"limit": PAGE_SIZE})],
+    "Create Booking": [
+        ("/guests/search", {"limit": SEARCH_LIMIT}),
+        ("/available-rooms", {"check_in": date.today().isoformat(),
+                              "check_out": (date.today() + timedelta(days=1)).isoformat()}),
+    ],
+    "Manage Booking": [("/bookings", {"limit": PAGE_SIZE})],
+}
+
+# Views of the current page that are not shown (filled in by view_selector)
+background_views = []
+
 # ==================== DASHBOARD PAGE ====================
 if page == "Dashboard":
     st.markdown('<h1 class="main-header">🏨 Hotel Management System Dashboard</h1>', unsafe_allow_html=True)
     
-    # Fetch dashboard data
-    rooms = fetch_data("/rooms")
-    guests = fetch_data("/guests")
-    bookings = fetch_data("/bookings")
+    # Fetch dashboard data: aggregates computed by the API plus the latest bookings
+    stats, recent = fetch_all(("/stats/dashboard", None), frame_request("/bookings", {"limit": 10}))
+    stats = stats or {}
+    bookings, _ = as_frame(recent)
     
     # Metrics
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Total Rooms", len(rooms))
+        st.metric("Total Rooms", stats.get('total_rooms', 0))
     
     with col2:
-        available_rooms = len([r for r in rooms if r['status'] == 'available'])
-        st.metric("Available Rooms", available_rooms)
+        st.metric("Available Rooms", stats.get('available_rooms', 0))
     
     with col3:
-        st.metric("Total Guests", len(guests))
+        st.metric("Total Guests", stats.get('total_guests', 0))
     
     with col4:
-        active_bookings = len([b for b in bookings if b['status'] in ['confirmed', 'checked-in']])
-        st.metric("Active Bookings", active_bookings)
+        st.metric("Active Bookings", stats.get('active_bookings', 0))
     
     st.divider()
     
     # Recent bookings
     st.subheader("📋 Recent Bookings")
-    if bookings:
-        df = pd.DataFrame(bookings)
-        df = df[['booking_id', 'guest_name', 'room_number', 'room_type', 'check_in_date', 'check_out_date', 'total_amount', 'status']]
+    if not bookings.empty:
+        df = bookings[['booking_id', 'guest_name', 'room_number', 'room_type', 'check_in_date', 'check_out_date', 'total_amount', 'status']]
         st.dataframe(df, width='stretch')
     else:
         st.info("No bookings found.")
@@ -141,18 +495,15 @@ if page == "Dashboard":
     
     with col1:
         st.subheader("🚪 Room Status Distribution")
-        if rooms:
-            status_counts = pd.DataFrame(rooms)['status'].value_counts()
-            st.bar_chart(status_counts)
+        if stats.get('room_status_counts'):
+            st.bar_chart(pd.Series(stats['room_status_counts'], name="count"))
         else:
             st.info("No room data available.")
     
     with col2:
         st.subheader("💰 Revenue by Room Type")
-        if bookings:
-            df = pd.DataFrame(bookings)
-            revenue_by_type = df.groupby('room_type')['total_amount'].sum()
-            st.bar_chart(revenue_by_type)
+        if stats.get('revenue_by_room_type'):
+            st.bar_chart(pd.Series(stats['revenue_by_room_type'], name="total_amount"))
         else:
             st.info("No booking data available.")
 
@@ -160,10 +511,10 @@ if page == "Dashboard":
 elif page == "Rooms":
     st.markdown('<h1 class="main-header">🚪 Room Management</h1>', unsafe_allow_html=True)
     
-    tab1, tab2, tab3 = st.tabs(["View Rooms", "Add Room", "Update/Delete Room"])
+    view = view_selector("rooms_view", ["View Rooms", "Availability Calendar", "Add Room", "Update/Delete Room"])
     
-    # View Rooms Tab
-    with tab1:
+    # View Rooms
+    if view == "View Rooms":
         st.subheader("All Rooms")
         rooms = fetch_data("/rooms")
         
@@ -182,8 +533,33 @@ elif page == "Rooms":
         else:
             st.info("No rooms found.")
     
-    # Add Room Tab
-    with tab2:
+    # Availability Calendar
+    if view == "Availability Calendar":
+        st.subheader("Availability Calendar")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            calendar_from = st.date_input("From", value=date.today(), key="calendar_from")
+        with col2:
+            calendar_days = st.select_slider("Nights", options=[7, 14, 30, 60, 90], value=30, key="calendar_days")
+        with col3:
+            calendar_type = st.selectbox("Room Type", ["", "Single", "Double", "Suite", "Deluxe"], key="calendar_room_type")
+        
+        calendar = fetch_data("/availability/calendar", {
+            "from": calendar_from.isoformat(),
+            "to": (calendar_from + timedelta(days=calendar_days - 1)).isoformat(),
+            "room_type": calendar_type,
+        })
+        
+        if calendar and calendar["grid"]:
+            grid = calendar_frame(calendar)
+            st.caption("Free rooms per night")
+            st.bar_chart((grid == "").sum().rename("free rooms").set_axis(pd.date_range(calendar["start"], periods=calendar["days"])))
+            st.dataframe(grid.style.map(CALENDAR_COLORS.get), width='stretch')
+        else:
+            st.info("No rooms found.")
+    
+    # Add Room
+    if view == "Add Room":
         st.subheader("Add New Room")
         with st.form("add_room_form"):
             col1, col2 = st.columns(2)
@@ -212,8 +588,8 @@ elif page == "Rooms":
                 else:
                     st.error("Please fill in all required fields.")
     
-    # Update/Delete Room Tab
-    with tab3:
+    # Update/Delete Room
+    if view == "Update/Delete Room":
         st.subheader("Update or Delete Room")
         rooms = fetch_data("/rooms")
         
@@ -268,22 +644,23 @@ elif page == "Rooms":
 elif page == "Guests":
     st.markdown('<h1 class="main-header">👥 Guest Management</h1>', unsafe_allow_html=True)
     
-    tab1, tab2, tab3 = st.tabs(["View Guests", "Add Guest", "Update/Delete Guest"])
+    view = view_selector("guests_view", ["View Guests", "Add Guest", "Update/Delete Guest"])
     
-    # View Guests Tab
-    with tab1:
+    # View Guests
+    if view == "View Guests":
         st.subheader("All Guests")
-        guests = fetch_data("/guests")
+        name_filter = st.text_input("Filter by name", key="view_guests_name")
+        guests = paginated_list("/guests", "view_guests", {"name": name_filter}, frame=True)
         
-        if guests:
-            df = pd.DataFrame(guests)
-            df['created_at'] = pd.to_datetime(df['created_at']).dt.strftime('%Y-%m-%d %H:%M')
+        if not guests.empty:
+            # assign() copies, so the cached page is left untouched
+            df = guests.assign(created_at=guests['created_at'].dt.strftime('%Y-%m-%d %H:%M'))
             st.dataframe(df, width='stretch')
         else:
             st.info("No guests found.")
     
-    # Add Guest Tab
-    with tab2:
+    # Add Guest
+    if view == "Add Guest":
         st.subheader("Add New Guest")
         with st.form("add_guest_form"):
             col1, col2 = st.columns(2)
@@ -314,10 +691,10 @@ elif page == "Guests":
                 else:
                     st.error("Please fill in all required fields.")
     
-    # Update/Delete Guest Tab
-    with tab3:
+    # Update/Delete Guest
+    if view == "Update/Delete Guest":
         st.subheader("Update or Delete Guest")
-        guests = fetch_data("/guests")
+        guests = search_guests("Find guest", "manage_guests_search")
         
         if guests:
             guest_options = {f"{g['first_name']} {g['last_name']} ({g['email']})": g['id'] for g in guests}
@@ -370,27 +747,48 @@ elif page == "Guests":
 elif page == "Bookings":
     st.markdown('<h1 class="main-header">📅 Booking Management</h1>', unsafe_allow_html=True)
     
-    tab1, tab2, tab3 = st.tabs(["View Bookings", "Create Booking", "Manage Booking"])
+    view = view_selector("bookings_view", ["View Bookings", "Create Booking", "Manage Booking"])
     
-    # View Bookings Tab
-    with tab1:
+    # View Bookings
+    if view == "View Bookings":
         st.subheader("All Bookings")
-        bookings = fetch_data("/bookings")
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            status_filter = st.selectbox("Status", ["", "confirmed", "checked-in", "checked-out", "cancelled"],
+                                         key="view_bookings_status")
+        with col2:
+            room_type_filter = st.selectbox("Room Type", ["", "Single", "Double", "Suite", "Deluxe"],
+                                            key="view_bookings_room_type")
+        with col3:
+            guest_filter = st.text_input("Guest Name", key="view_bookings_guest")
+        with col4:
+            date_window = st.date_input("Stay Overlaps", value=(), key="view_bookings_dates")
+        booking_filters = {
+            "status": status_filter,
+            "room_type": room_type_filter,
+            "guest_name": guest_filter,
+            "from": date_window[0].isoformat() if len(date_window) > 0 else None,
+            "to": date_window[1].isoformat() if len(date_window) > 1 else None,
+        }
+        bookings = paginated_list("/bookings", "view_bookings", booking_filters, frame=True)
         
-        if bookings:
-            df = pd.DataFrame(bookings)
-            st.dataframe(df, width='stretch')
+        # Full exports stream straight from the API instead of going through the pager
+        export_params = {k: v for k, v in dict(booking_filters, format="csv").items() if v}
+        st.link_button("⬇️ Export CSV", f"{API_BASE_URL}/bookings/export?{urlencode(export_params)}")
+        
+        if not bookings.empty:
+            st.dataframe(bookings, width='stretch')
         else:
             st.info("No bookings found.")
     
-    # Create Booking Tab
-    with tab2:
+    # Create Booking
+    if view == "Create Booking":
         st.subheader("Create New Booking")
         
-        guests = fetch_data("/guests")
+        guests = search_guests("Find guest", "create_booking_guest")
         
         if not guests:
-            st.warning("Please add guests first before creating a booking.")
+            st.warning("No matching guests. Please add guests first before creating a booking.")
         else:
             # Date selection first
             col1, col2 = st.columns(2)
@@ -422,12 +820,14 @@ elif page == "Bookings":
                             guest_id = guest_options[selected_guest]
                             
                             room_options = {f"{r['room_number']} - {r['room_type']} (Rs{r['price']}/night)": r for r in available_rooms}
-                            selected_room = st.selectbox("Select Room", list(room_options.keys()))
-                            room = room_options[selected_room]
+                            # Several rooms (group bookings) are booked together, all or nothing
+                            selected_rooms = st.multiselect("Select Room(s)", list(room_options.keys()),
+                                                            default=list(room_options.keys())[:1])
+                            rooms = [room_options[label] for label in selected_rooms]
                         
                         with col2:
                             nights = (check_out - check_in).days
-                            total_amount = nights * int(room['price'])
+                            total_amount = nights * sum(int(room['price']) for room in rooms)
                             st.metric("Number of Nights", nights)
                             st.metric("Total Amount", f"Rs {total_amount}")
                             
@@ -435,16 +835,21 @@ elif page == "Bookings":
                         
                         submit = st.form_submit_button("Create Booking", width='stretch')
                         
-                        if submit:
-                            booking_data = {
+                        if submit and not rooms:
+                            st.error("Please select at least one room.")
+                        elif submit:
+                            bookings = [{
                                 "guest_id": guest_id,
                                 "room_id": room['id'],
                                 "check_in_date": check_in.isoformat(),
                                 "check_out_date": check_out.isoformat(),
-                                "total_amount": total_amount,
+                                "total_amount": nights * int(room['price']),
                                 "status": status
-                            }
-                            result = post_data("/bookings", booking_data)
+                            } for room in rooms]
+                            if len(bookings) == 1:
+                                result = post_data("/bookings", bookings[0])
+                            else:
+                                result = post_data("/bookings/batch", {"bookings": bookings})
                             if result:
                                 st.success("✅ Booking created successfully!")
                                 st.balloons()
@@ -452,10 +857,11 @@ elif page == "Bookings":
                             else:
                                 st.error("❌ Failed to create booking. Please try again.")
     
-    # Manage Booking Tab
-    with tab3:
+    # Manage Booking
+    if view == "Manage Booking":
         st.subheader("Manage Bookings")
-        bookings = fetch_data("/bookings")
+        guest_filter = st.text_input("Find booking by guest name", key="manage_bookings_guest")
+        bookings = paginated_list("/bookings", "manage_bookings", {"guest_name": guest_filter})
         
         if bookings:
             # Filter active bookings
@@ -475,6 +881,15 @@ elif page == "Bookings":
                         # Display current booking info
                         st.info(f"**Current Status:** {booking['status'].upper()}")
                         
+                        # Searches for another guest or room; the form lists the matches
+                        col_q1, col_q2 = st.columns(2)
+                        with col_q1:
+                            guest_query = st.text_input("Find another guest", key="manage_booking_guest",
+                                                        placeholder="Name, email or phone")
+                        with col_q2:
+                            room_query = st.text_input("Find another room", key="manage_booking_room",
+                                                       placeholder="Room number")
+                        
                         col1, col2 = st.columns([2, 1])
                         
                         with col1:
@@ -482,16 +897,24 @@ elif page == "Bookings":
                             with st.form("update_booking_form"):
                                 st.write("### Update Booking Details")
                                 
-                                # Get guests and rooms
-                                guests = fetch_data("/guests")
-                                all_rooms = fetch_data("/rooms")
+                                # Get matching guests and rooms; make sure the booking's own guest and room are listed
+                                guests, current, all_rooms, booked_room = fetch_all(
+                                    ("/guests/search", {"q": guest_query.strip(), "limit": SEARCH_LIMIT}),
+                                    (f"/guests/{booking['guest_id']}", None),
+                                    ("/rooms/search", {"q": room_query.strip(), "limit": SEARCH_LIMIT}),
+                                    (f"/rooms/{booking['room_id']}", None),
+                                )
+                                if current and not any(g['id'] == booking['guest_id'] for g in guests):
+                                    guests = [current] + guests
+                                if booked_room and not any(r['id'] == booking['room_id'] for r in all_rooms):
+                                    all_rooms = [booked_room] + all_rooms
                                 
                                 col_a, col_b = st.columns(2)
                                 
                                 with col_a:
                                     # Guest selection
-                                    guest_options = {f"{g['first_name']} {g['last_name']}": g['id'] for g in guests}
-                                    current_guest = next((k for k, v in guest_options.items() if booking['guest_name'] in k), list(guest_options.keys())[0])
+                                    guest_options = {f"{g['first_name']} {g['last_name']} ({g['email']})": g['id'] for g in guests}
+                                    current_guest = next((k for k, v in guest_options.items() if v == booking['guest_id']), list(guest_options.keys())[0])
                                     selected_guest = st.selectbox("Guest", list(guest_options.keys()), index=list(guest_options.keys()).index(current_guest))
                                     new_guest_id = guest_options[selected_guest]
                                     
@@ -580,3 +1003,6 @@ elif page == "Bookings":
 # Footer
 st.sidebar.divider()
 st.sidebar.info("🏨 Hotel Management System")
+
+# Load the other views' data in the background while this one is on screen
+prefetch(*(call for view in background_views for call in VIEW_PREFETCH.get(view, ())))